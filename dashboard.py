@@ -1,10 +1,16 @@
 import streamlit as st
-from src.loader import load_data, get_state_list, get_district_list
-from src.plots import plot_trend, plot_bar_distribution
+from src.loader import load_data, load_cube, load_date_indexes, load_sketches, load_samples, get_state_list, get_district_list, SAMPLE_FRACTIONS
+from src.figure_cache import cached_figure, figure_key, figure_cache
+from src.views import View, enrolment_pattern_figure, likely_next_views
+from src.prefetch import Prefetcher
+from src.data_access import data_version
+from src.sampling import correlation_interval
 import plotly.express as px
 import pandas as pd
 from ydata_profiling import ProfileReport
 import streamlit.components.v1 as components
+import time
+from src.panels import panel, record_timing, timings_frame
 
 # Page config
 st.set_page_config(
@@ -12,15 +18,25 @@ st.set_page_config(
     page_icon="🇮🇳",
     layout="wide"
 )
+run_start = time.perf_counter()
+
+# Speculative work from the previous run must not compete with this one
+prefetcher = st.session_state.setdefault("_prefetcher", Prefetcher())
+prefetcher.pause()
 
 # Load Data
 with st.spinner('Loading Aadhaar Datasets...'):
     data = load_data()
+    cube = load_cube()
+    date_indexes = load_date_indexes()
+    sketches = load_sketches()
 
-if data is None:
+if data is None or cube is None or date_indexes is None or sketches is None:
     st.error("Failed to load data. Please check raw files.")
     st.stop()
 
+version = data_version()
+
 
 
 enrolment_df = data['enrolment']
@@ -43,14 +59,129 @@ if selected_state != "All":
 else:
     selected_district = "All"
 
-# Helper to filter data
-def filter_data(df):
-    temp_df = df.copy()
-    if selected_state != "All":
-        temp_df = temp_df[temp_df['state'] == selected_state]
-        if selected_district != "All":
-            temp_df = temp_df[temp_df['district'] == selected_district]
-    return temp_df
+# Date Range Filter (served from the prefix-sum date indexes)
+min_date = cube.first_date.date()
+max_date = cube.last_date.date()
+if min_date < max_date:
+    start_date, end_date = st.sidebar.slider("Date Range", min_value=min_date, max_value=max_date, value=(min_date, max_date))
+else:
+    start_date, end_date = min_date, max_date
+
+# Execution mode of the exploratory pages: approximate mode runs them on
+# persisted state-stratified samples and labels results with error bounds
+samples = None
+if page in ("Visual Analysis", "Automated Profiling"):
+    st.sidebar.header("Execution Mode")
+    mode = st.sidebar.radio("Mode", ["Approximate", "Exact"], help="Approximate: state-stratified sample with 95% error bounds. Exact: full datasets.")
+    if mode == "Approximate":
+        sample_fraction = st.sidebar.select_slider("Sample Fraction", options=list(SAMPLE_FRACTIONS),
+                                                   value=SAMPLE_FRACTIONS[len(SAMPLE_FRACTIONS) // 2],
+                                                   format_func=lambda f: f"{f:.0%}")
+        samples = load_samples(sample_fraction)
+
+# The current view; its helpers query the date indexes and the cube for the active filters
+view = View(page, selected_state, selected_district, start_date, end_date, cube, date_indexes, version)
+geo_filter, filter_data, daily_data, daily_totals = view.geo_filter, view.filter_data, view.daily_data, view.daily_totals
+figures = view.figures()
+
+# Panels: independently rerunnable sections whose widgets only rerun themselves
+@panel("Feature Distributions")
+def distribution_panel(enrolment_df, demographic_df, biometric_df, samples=None):
+    dataset_choice = st.selectbox("Select Dataset", ["Enrolment", "Demographic", "Biometric"])
+
+    if dataset_choice == "Enrolment":
+        target_df = enrolment_df
+        num_cols = [c for c in ['age_0_5', 'age_5_17', 'age_18_greater'] if c in target_df.columns]
+    elif dataset_choice == "Demographic":
+        target_df = demographic_df
+        num_cols = [c for c in ['demo_age_5_17', 'demo_age_17_'] if c in target_df.columns]
+    else:
+        target_df = biometric_df
+        num_cols = [c for c in ['bio_age_5_17', 'bio_age_17_'] if c in target_df.columns]
+
+    if num_cols:
+        selected_col = st.selectbox("Select Column to Visualize", num_cols)
+
+        # Histogram
+        fig_hist = px.histogram(target_df, x=selected_col, nbins=50, title=f"Distribution of {selected_col}", marginal="box", color_discrete_sequence=['teal'])
+        st.plotly_chart(fig_hist, use_container_width=True)
+        if samples:
+            sample = samples[dataset_choice.lower()]
+            st.caption(f"Approximate: {sample.label()}. The cumulative share below any value is within "
+                       f"±{sample.distribution_margin():.1%} of the full data (95%, DKW bound).")
+    else:
+        st.warning("No suitable numeric columns found for distribution plot.")
+
+
+@panel("Automated Profiling")
+def profiling_panel(enrolment_df, demographic_df, biometric_df, samples=None):
+    dataset_option = st.selectbox("Select Dataset to Profile", ["Enrolment Data", "Demographic Data", "Biometric Data"])
+
+    if dataset_option == "Enrolment Data":
+        target_df = enrolment_df
+    elif dataset_option == "Demographic Data":
+        target_df = demographic_df
+    else:
+        target_df = biometric_df
+
+    if samples:
+        sample = samples[dataset_option.split()[0].lower()]
+        st.info(f"Approximate: profiling a {sample.label()}. Percentages and shares are within "
+                f"±{sample.proportion_margin():.1%} (95%); counts cover the sample only.")
+    else:
+        st.warning("⚠️ **Note**: Generating a profile report can take a few minutes depending on dataset size.")
+
+    if st.button("Generate Profiling Report"):
+        with st.spinner(f"Generating report for {dataset_option}..."):
+            try:
+                # Use a minimal configuration if data is large, or default
+                title = f"{dataset_option} Profiling Report" + (" (Sample)" if samples else "")
+                pr = ProfileReport(target_df, title=title, minimal=True)
+                # Display using components.html
+                components.html(pr.to_html(), height=1000, scrolling=True)
+            except Exception as e:
+                st.error(f"Error generating report: {e}")
+
+
+@panel("Forensic Deep Dive")
+def deep_dive_panel(risk_df, avg_adult_ratio, risk_state, cube, sketches, start_date, end_date):
+    st.markdown("---")
+    st.subheader("district-Level Forensic Deep Dive")
+    
+    inspect_dist = st.selectbox("Select District to Investigate", risk_df['district'].head(20).tolist())
+    
+    if inspect_dist:
+        # Daily Trend for this district
+        fig_inve = enrolment_pattern_figure(cube, risk_state, inspect_dist, start_date, end_date)
+        st.plotly_chart(fig_inve, use_container_width=True)
+        
+        # Composition
+        d_trend = cube.daily('enrolment', start_date, end_date, state=risk_state, district=inspect_dist)
+        d_total = d_trend[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
+        d_total.columns = ['Age Group', 'Count']
+        
+        c1, c2 = st.columns(2)
+        c1.plotly_chart(px.pie(d_total, names='Age Group', values='Count', title=f"Age Composition: {inspect_dist}", hole=0.4), use_container_width=True)
+        
+        with c2:
+            st.warning(f"**Forensic Note**: Investigating {inspect_dist}")
+            curr_aii = risk_df[risk_df['district'] == inspect_dist]['Adult_Influx_Index'].values[0]
+            
+            if curr_aii > avg_adult_ratio * 2:
+                st.error(f"⚠️ **Abnormal Adult Influx**: AII is {curr_aii:.2f} ({(curr_aii/avg_adult_ratio):.1f}x state avg). Strong indicator of non-birth based enrollment.")
+            else:
+                st.info(f"ℹ️ **Moderate Profile**: AII is {curr_aii:.2f}. Within normal variance, check specific dates for spikes.")
+
+            # Pincode-level volume profile from the quantile sketches (all dates)
+            d_median, d_p95 = sketches['enrolment'].volume_quantiles([0.5, 0.95], risk_state, inspect_dist)
+            region_p95 = sketches['enrolment'].volume_quantiles([0.95], risk_state)[0]
+            m1, m2 = st.columns(2)
+            m1.metric("Active Pincodes", f"{sketches['enrolment'].distinct_pincodes(risk_state, inspect_dist):,}")
+            m2.metric("P95 Daily Enrolments / Pincode", f"{d_p95:,.1f}", delta=f"{d_p95 - region_p95:+,.1f} vs region", delta_color="inverse", help=f"Median: {d_median:,.1f}")
+
+            if d_p95 > region_p95 * 2:
+                st.error(f"⚠️ **Pincode Surges**: Busy-day volume per pincode is {(d_p95/region_p95):.1f}x the regional P95. Check for bulk enrolment camps.")
+
 
 # Main Content
 if page == "Overview":
@@ -58,12 +189,12 @@ if page == "Overview":
     st.markdown("### Unlocking Societal Trends in Aadhaar Enrolment and Updates")
     
     # Filter data
-    filtered_enrolment = filter_data(enrolment_df)
-    filtered_demographic = filter_data(demographic_df)
-    filtered_biometric = filter_data(biometric_df)
+    filtered_enrolment = filter_data('enrolment')
+    filtered_demographic = filter_data('demographic')
+    filtered_biometric = filter_data('biometric')
     
     # 1. Key Metrics (KPIs)
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     total_enrolments = filtered_enrolment[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum()
     total_demographic_updates = filtered_demographic[['demo_age_5_17', 'demo_age_17_']].sum().sum()
     total_biometric_updates = filtered_biometric[['bio_age_5_17', 'bio_age_17_']].sum().sum()
@@ -71,6 +202,12 @@ if page == "Overview":
     col1.metric("Total Enrolments", f"{total_enrolments:,.0f}")
     col2.metric("Demographic Updates", f"{total_demographic_updates:,.0f}")
     col3.metric("Biometric Updates", f"{total_biometric_updates:,.0f}")
+
+    # Distinct pincodes across all three datasets (union of the HyperLogLog sketches)
+    pincode_sketch = sketches['enrolment'].pincode_sketch(*geo_filter())
+    for name in ['demographic', 'biometric']:
+        pincode_sketch = pincode_sketch.merge(sketches[name].pincode_sketch(*geo_filter()))
+    col4.metric("Active Pincodes", f"{pincode_sketch.count():,.0f}", help="Estimated distinct pincodes with any activity (all dates)")
     st.markdown("---")
 
     col_1, col_2 = st.columns(2)
@@ -78,262 +215,127 @@ if page == "Overview":
     # 2. Total Activity Trend (Combined Line Chart)
     with col_1:
          # Aggregate by date
-        enrol_trend = filtered_enrolment.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Enrolments')
-        demo_trend = filtered_demographic.groupby('date')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1).reset_index(name='Demographic Updates')
-        bio_trend = filtered_biometric.groupby('date')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1).reset_index(name='Biometric Updates')
-        
-        # Merge trends
-        combined_trend = pd.merge(enrol_trend, demo_trend, on='date', how='outer').merge(bio_trend, on='date', how='outer').fillna(0)
-        combined_melted = combined_trend.melt(id_vars='date', var_name='Activity Type', value_name='Count')
-        
         st.subheader("Total Activity Trend")
-        fig_trend = plot_trend(combined_melted, 'date', 'Count', 'Daily Activity by Type', color='Activity Type')
-        st.plotly_chart(fig_trend, use_container_width=True)
+        st.plotly_chart(figures['Total Activity Trend'], use_container_width=True)
 
     # 3. Activity Composition (Donut Chart)
     with col_2:
         st.subheader("Activity Composition")
-        activity_data = pd.DataFrame({
-            'Activity': ['Enrolments', 'Demographic Updates', 'Biometric Updates'],
-            'Count': [total_enrolments, total_demographic_updates, total_biometric_updates]
-        })
-        from src.plots import plot_donut
-        fig_donut = plot_donut(activity_data, 'Count', 'Activity', 'Share of Total Activity')
-        st.plotly_chart(fig_donut, use_container_width=True)
+        st.plotly_chart(figures['Activity Composition'], use_container_width=True)
 
     col_3, col_4 = st.columns(2)
 
-    # 4. Top States Leaderboard (Bar Chart) - Only meaningful if "All" states selected or analysing districts
+    # 4. Top States Leaderboard (Bar Chart) - States when "All" states selected, otherwise the state's districts
+    level = 'State' if selected_state == "All" else 'District'
     with col_3:
-        if selected_state == "All":
-            st.subheader("Top 10 States by Total Activity")
-            # Calculate total activity per state
-            e_state = enrolment_df.groupby('state')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-            d_state = demographic_df.groupby('state')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
-            b_state = biometric_df.groupby('state')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
-            
-            total_state = (e_state.add(d_state, fill_value=0).add(b_state, fill_value=0)).reset_index(name='Total Activity')
-            top_states = total_state.sort_values(by='Total Activity', ascending=False).head(10)
-            fig_bar = plot_bar_distribution(top_states, 'state', 'Total Activity', 'Top 10 States')
-            st.plotly_chart(fig_bar, use_container_width=True)
-        else:
-            st.subheader("Top 10 Districts by Total Activity")
-            e_dist = filtered_enrolment.groupby('district')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1)
-            d_dist = filtered_demographic.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1)
-            b_dist = filtered_biometric.groupby('district')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1)
-            
-            total_dist = (e_dist.add(d_dist, fill_value=0).add(b_dist, fill_value=0)).reset_index(name='Total Activity')
-            top_dist = total_dist.sort_values(by='Total Activity', ascending=False).head(10)
-            fig_bar = plot_bar_distribution(top_dist, 'district', 'Total Activity', 'Top 10 Districts')
-            st.plotly_chart(fig_bar, use_container_width=True)
+        st.subheader(f"Top 10 {level}s by Total Activity")
+        st.plotly_chart(figures['Top Regions'], use_container_width=True)
 
     # 5. Least Active Regions (Bar Chart)
     with col_4:
-        if selected_state == "All":
-            st.subheader("Bottom 10 States (Least Active)")
-            bottom_states = total_state.sort_values(by='Total Activity', ascending=True).head(10)
-            fig_bar_low = plot_bar_distribution(bottom_states, 'state', 'Total Activity', 'Least Active States')
-            st.plotly_chart(fig_bar_low, use_container_width=True)
-        else:
-            st.subheader("Bottom 10 Districts (Least Active)")
-            bottom_dist = total_dist.sort_values(by='Total Activity', ascending=True).head(10)
-            fig_bar_low = plot_bar_distribution(bottom_dist, 'district', 'Total Activity', 'Least Active Districts')
-            st.plotly_chart(fig_bar_low, use_container_width=True)
+        st.subheader(f"Bottom 10 {level}s (Least Active)")
+        st.plotly_chart(figures['Bottom Regions'], use_container_width=True)
 
 
 elif page == "Enrolment Analysis":
     st.title("Enrolment Analysis")
-    filtered_df = filter_data(enrolment_df)
+    group_col = 'district' if selected_state != 'All' else 'state'
     
     col1, col2 = st.columns(2)
     
     # 1. Trend Analysis (Line)
     with col1:
         st.subheader("Enrolment Trends Over Time")
-        daily_trends = filtered_df.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        daily_trends_melted = daily_trends.melt(id_vars='date', var_name='Age Group', value_name='Count')
-        fig_trend = plot_trend(daily_trends_melted, 'date', 'Count', 'Enrolments by Age Group', color='Age Group')
-        st.plotly_chart(fig_trend, use_container_width=True)
+        st.plotly_chart(figures['Trend'], use_container_width=True)
     
     # 2. Age Distribution (Pie)
     with col2:
         st.subheader("Age Group Distribution")
-        total_by_age = filtered_df[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        total_by_age.columns = ['Age Group', 'Total']
-        fig_pie = px.pie(total_by_age, values='Total', names='Age Group', title='Enrolment Share by Age', hole=0.3)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figures['Age Share'], use_container_width=True)
 
     col3, col4 = st.columns(2)
 
     # 3. Geographic Hotspots (Bar)
     with col3:
-        group_col = 'district' if selected_state != 'All' else 'state'
         st.subheader(f"Top 10 {group_col.title()}s by Enrolment")
-        geo_group = filtered_df.groupby(group_col)[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Total')
-        top_geo = geo_group.sort_values(by='Total', ascending=False).head(10)
-        fig_geo = plot_bar_distribution(top_geo, group_col, 'Total', f'Top 10 {group_col.title()}s')
-        st.plotly_chart(fig_geo, use_container_width=True)
+        st.plotly_chart(figures['Geographic Top 10'], use_container_width=True)
 
-    # 4. Performance Heatmap (Treemap)
+    # 4. Performance Heatmap (Treemap): State > District for "All" states, otherwise the state's districts
     with col4:
         st.subheader("Enrolment Volume Heatmap")
-        from src.plots import plot_treemap
-        # If All states, show State > District hierarchy. If specific state, show District hierarchy
-        if selected_state == "All":
-            path = ['state', 'district']
-            # Limit to top 500 rows for performance in treemap if dataset is huge, or aggregate
-            treemap_df = filtered_df.groupby(['state', 'district'])[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Total')
-            # Filter zero values
-            treemap_df = treemap_df[treemap_df['Total'] > 0]
-            fig_tree = plot_treemap(treemap_df, path, 'Total', 'Enrolment Distribution')
-            st.plotly_chart(fig_tree, use_container_width=True)
-        else:
-            path = ['district']
-            treemap_df = filtered_df.groupby(['district'])[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Total')
-            treemap_df = treemap_df[treemap_df['Total'] > 0]
-            fig_tree = plot_treemap(treemap_df, path, 'Total', 'District Enrolment Distribution')
-            st.plotly_chart(fig_tree, use_container_width=True)
+        st.plotly_chart(figures['Treemap'], use_container_width=True)
 
 elif page == "Demographic Updates":
     st.title("Demographic Update Trends")
-    filtered_df = filter_data(demographic_df)
+    group_col = 'district' if selected_state != 'All' else 'state'
     
     col1, col2 = st.columns(2)
 
     # 1. Update Trends (Line)
     with col1:
         st.subheader("Update Activity Over Time")
-        daily_updates = filtered_df.groupby('date')[['demo_age_5_17', 'demo_age_17_']].sum().reset_index()
-        daily_updates_melted = daily_updates.melt(id_vars='date', var_name='Age Category', value_name='Updates')
-        fig = plot_trend(daily_updates_melted, 'date', 'Updates', 'Demographic Updates vs Time', color='Age Category')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['Trend'], use_container_width=True)
 
     # 2. Age Composition (Pie)
     with col2:
         st.subheader("Updates by Age Category")
-        total_by_age = filtered_df[['demo_age_5_17', 'demo_age_17_']].sum().reset_index()
-        total_by_age.columns = ['Age Group', 'Total']
-        fig_pie = px.pie(total_by_age, values='Total', names='Age Group', title='Demographic Updates Share', hole=0.3)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figures['Age Share'], use_container_width=True)
 
     col3, col4 = st.columns(2)
 
     # 3. Geographic Spread (Bar)
     with col3:
-        group_col = 'district' if selected_state != 'All' else 'state'
         st.subheader(f"Top 10 {group_col.title()}s for Updates")
-        geo_group = filtered_df.groupby(group_col)[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1).reset_index(name='Total')
-        top_geo = geo_group.sort_values(by='Total', ascending=False).head(10)
-        fig_geo = plot_bar_distribution(top_geo, group_col, 'Total', f'Highest Update Regions ({group_col.title()})')
-        st.plotly_chart(fig_geo, use_container_width=True)
+        st.plotly_chart(figures['Geographic Top 10'], use_container_width=True)
 
-    # 4. Correlation Analysis (Scatter) - Enrolment vs Updates
+    # 4. Correlation Analysis (Scatter) - Enrolment vs Updates per district
     with col4:
         st.subheader("Correlation: Enrolment vs Updates")
-        # Need to merge enrolment and demographic data on district level
-        # Aggregate filtered enrolment
-        filt_enrol = filter_data(enrolment_df)
-        e_agg = filt_enrol.groupby('district')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Enrolment_Count')
-        d_agg = filtered_df.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1).reset_index(name='Update_Count')
-        
-        merged_scatter = pd.merge(e_agg, d_agg, on='district')
-        from src.plots import plot_scatter
-        fig_scatter = plot_scatter(merged_scatter, 'Enrolment_Count', 'Update_Count', 'Enrolment vs Update Volume', hover_data=['district'])
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        st.plotly_chart(figures['Correlation Scatter'], use_container_width=True)
 
     # 5. Migration/Movement Patterns (Sunburst)
     st.markdown("---")
     st.subheader("Migration Pattern Analysis (State > District > Age Group)")
     st.info("Visualizing where demographic updates (often linked to relocation) are happening, broken down by Age Group.")
-    
-    # Prepare data for Sunburst
-    # Use filtered_df to respect active filters
-    move_df = filtered_df.copy()
-    
-    # Melt to get Age Group as a dimension
-    move_melted = move_df.melt(id_vars=['state', 'district'], 
-                               value_vars=['demo_age_5_17', 'demo_age_17_'], 
-                               var_name='Age_Group', value_name='Count')
-    
-    # Rename Age Groups for better readability
-    move_melted['Age_Group'] = move_melted['Age_Group'].replace({
-        'demo_age_5_17': 'Age 5-17',
-        'demo_age_17_': 'Age 17+'
-    })
-    
-    # Aggregate data
-    if selected_state == "All":
-        # Group by State -> District -> Age Group
-        move_agg = move_melted.groupby(['state', 'district', 'Age_Group'])['Count'].sum().reset_index()
-        # Filter zero counts
-        move_agg = move_agg[move_agg['Count'] > 0]
-        
-        # Use Sunburst with limited depth or top values if needed, but plotting all for now
-        fig_sun = px.sunburst(move_agg, path=['state', 'district', 'Age_Group'], values='Count',
-                              title="Demographic Updates Hierarchy (Migration Proxy)",
-                              color='Count', color_continuous_scale='RdBu_r')
-    else:
-        # Group by District -> Age Group (State is fixed)
-        move_agg = move_melted.groupby(['district', 'Age_Group'])['Count'].sum().reset_index()
-        move_agg = move_agg[move_agg['Count'] > 0]
-        
-        fig_sun = px.sunburst(move_agg, path=['district', 'Age_Group'], values='Count',
-                              title=f"Demographic Updates Hierarchy in {selected_state}",
-                              color='Count', color_continuous_scale='RdBu_r')
-        
-    st.plotly_chart(fig_sun, use_container_width=True)
+    st.plotly_chart(figures['Migration Sunburst'], use_container_width=True)
 
 
 elif page == "Biometric Updates":
     st.title("Biometric Update Trends")
-    filtered_df = filter_data(biometric_df)
+    group_col = 'district' if selected_state != 'All' else 'state'
     
     col1, col2 = st.columns(2)
 
     # 1. Biometric Trends (Line)
     with col1:
         st.subheader("Biometric Updates Over Time")
-        daily_bio = filtered_df.groupby('date')[['bio_age_5_17', 'bio_age_17_']].sum().reset_index()
-        daily_bio_melted = daily_bio.melt(id_vars='date', var_name='Age Category', value_name='Updates')
-        fig = plot_trend(daily_bio_melted, 'date', 'Updates', 'Biometric Updates vs Time', color='Age Category')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['Trend'], use_container_width=True)
 
     # 2. Age Segmentation (Pie)
     with col2:
         st.subheader("Biometric Updates by Age")
-        total_by_age = filtered_df[['bio_age_5_17', 'bio_age_17_']].sum().reset_index()
-        total_by_age.columns = ['Age Group', 'Total']
-        fig_pie = px.pie(total_by_age, values='Total', names='Age Group', title='Biometric Updates Share', hole=0.3)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figures['Age Share'], use_container_width=True)
 
     col3, col4 = st.columns(2)
 
     # 3. Geographic Focus (Bar)
     with col3:
-        group_col = 'district' if selected_state != 'All' else 'state'
         st.subheader(f"Top 10 {group_col.title()}s for Biometrics")
-        geo_group = filtered_df.groupby(group_col)[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1).reset_index(name='Total')
-        top_geo = geo_group.sort_values(by='Total', ascending=False).head(10)
-        fig_geo = plot_bar_distribution(top_geo, group_col, 'Total', f'Highest Biometric Update Areas')
-        st.plotly_chart(fig_geo, use_container_width=True)
+        st.plotly_chart(figures['Geographic Top 10'], use_container_width=True)
 
     # 4. Update Intensity (Scatter) - Demographic vs Biometric
     with col4:
         st.subheader("Demographic vs Biometric Intensity")
-        # Aggregate Demographic
-        filt_demo = filter_data(demographic_df)
-        d_agg = filt_demo.groupby('district')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1).reset_index(name='Demo_Count')
-        b_agg = filtered_df.groupby('district')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1).reset_index(name='Bio_Count')
-        
-        merged_scatter = pd.merge(d_agg, b_agg, on='district')
-        from src.plots import plot_scatter
-        fig_scatter = plot_scatter(merged_scatter, 'Demo_Count', 'Bio_Count', 'Demographic vs Biometric', hover_data=['district'])
-        st.plotly_chart(fig_scatter, use_container_width=True)
-
+        st.plotly_chart(figures['Intensity Scatter'], use_container_width=True)
 
 elif page == "Visual Analysis":
     st.title("Visual Model Analysis")
     st.markdown("### Exploratory Data Analysis & Visualizations")
+
+    # Approximate mode: every tab below runs on the stratified samples
+    if samples:
+        enrolment_df, demographic_df, biometric_df = (samples[name].frame for name in ('enrolment', 'demographic', 'biometric'))
+        st.info(f"Approximate mode: {samples['enrolment'].fraction:.0%} state-stratified samples, shown with 95% error bounds. Switch to **Exact** in the sidebar for full scans.")
     
     # Check if dataframes are available
     if 'enrolment_df' not in locals() or 'demographic_df' not in locals() or 'biometric_df' not in locals():
@@ -343,19 +345,27 @@ elif page == "Visual Analysis":
         
         # helper for missing values
         def plot_missing_values(df, name):
-            missing = df.isnull().sum()
-            missing = missing[missing > 0]
-            if missing.empty:
+            if samples:
+                # Stratified estimate with its 95% half-width
+                sample = samples[name.lower()]
+                missing_df = sample.missing_share()
+                if missing_df.empty:
+                    st.info(f"No missing values observed in the {name} sample ({len(sample):,} rows). "
+                            f"In the full data, each column is at most {sample.unobserved_share_bound():.2%} missing (95% upper bound).")
+                    return None
+            else:
+                missing = df.isnull().sum()
+                missing_df = missing[missing > 0].reset_index()
+                missing_df.columns = ['Column', 'Missing Count']
+                missing_df['Percentage'] = (missing_df['Missing Count'] / len(df)) * 100
+            if missing_df.empty:
                 st.info(f"No missing values in {name} Dataset!")
                 return None
             
-            missing_df = missing.reset_index()
-            missing_df.columns = ['Column', 'Missing Count']
-            missing_df['Percentage'] = (missing_df['Missing Count'] / len(df)) * 100
-            
             fig = px.bar(missing_df, x='Column', y='Percentage', 
-                        title=f'Missing Values in {name} Data',
+                        title=f'Missing Values in {name} Data' + (' (± approx. 95% CI)' if samples else ''),
                         color='Percentage', 
+                        error_y='Error' if samples else None,
                         text=missing_df['Percentage'].apply(lambda x: f'{x:.2f}%'),
                         color_continuous_scale='Reds')
             return fig
@@ -382,52 +392,50 @@ elif page == "Visual Analysis":
         with tab2:
             st.subheader("Correlation Heatmaps")
             
-            # Prepare datasets for correlation
-            # Select only numeric columns
-            e_corr = enrolment_df.select_dtypes(include=['float64', 'int64']).corr()
-            d_corr = demographic_df.select_dtypes(include=['float64', 'int64']).corr()
-            b_corr = biometric_df.select_dtypes(include=['float64', 'int64']).corr()
+            # Correlations over the numeric columns of the datasets (or samples)
+            # (cached with the figure, so they are only computed on a miss)
+            mode_key = samples['enrolment'].fraction if samples else "exact"
+
+            def correlation_heatmap(df, title, scale):
+                numeric = df.select_dtypes(include=['float64', 'int64'])
+                corr = numeric.corr()
+                if not samples:
+                    return px.imshow(corr, text_auto=True, aspect="auto", title=title, color_continuous_scale=scale)
+                # Label each coefficient with the half-width of its approximate 95% interval
+                low, high = correlation_interval(numeric)
+                half = (high - low) / 2
+                fig = px.imshow(corr, aspect="auto", title=f"{title} (± approx. 95% CI)", color_continuous_scale=scale)
+                fig.update_traces(text=[[f"{r:.2f} ±{h:.2f}" for r, h in zip(row_r, row_h)] for row_r, row_h in zip(corr.values, half)],
+                                  texttemplate="%{text}")
+                return fig
+
+            if samples:
+                st.caption("Correlation intervals are large-sample approximations that treat the sample as simple random: "
+                           "stratification usually makes them wider than needed, while samples under ~1k rows can make them too narrow.")
 
             col_a, col_b = st.columns(2)
             
             with col_a:
                 st.markdown("#### Enrolment Correlations")
-                fig_hm_e = px.imshow(e_corr, text_auto=True, aspect="auto", title="Enrolment Correlation Matrix", color_continuous_scale='RdBu_r')
+                fig_hm_e = cached_figure(figure_key(page, "Enrolment Correlations", version, mode=mode_key),
+                                         lambda: correlation_heatmap(enrolment_df, "Enrolment Correlation Matrix", 'RdBu_r'))
                 st.plotly_chart(fig_hm_e, use_container_width=True)
                 
             with col_b:
                 st.markdown("#### Demographic Correlations")
-                fig_hm_d = px.imshow(d_corr, text_auto=True, aspect="auto", title="Demographic Correlation Matrix", color_continuous_scale='Viridis')
+                fig_hm_d = cached_figure(figure_key(page, "Demographic Correlations", version, mode=mode_key),
+                                         lambda: correlation_heatmap(demographic_df, "Demographic Correlation Matrix", 'Viridis'))
                 st.plotly_chart(fig_hm_d, use_container_width=True)
                 
             st.markdown("#### Biometric Correlations")
-            fig_hm_b = px.imshow(b_corr, text_auto=True, aspect="auto", title="Biometric Correlation Matrix", color_continuous_scale='Magma')
+            fig_hm_b = cached_figure(figure_key(page, "Biometric Correlations", version, mode=mode_key),
+                                     lambda: correlation_heatmap(biometric_df, "Biometric Correlation Matrix", 'Magma'))
             st.plotly_chart(fig_hm_b, use_container_width=True)
 
         with tab3:
             st.subheader("Feature Distributions")
             
-            dataset_choice = st.selectbox("Select Dataset", ["Enrolment", "Demographic", "Biometric"])
-            
-            if dataset_choice == "Enrolment":
-                target_df = enrolment_df
-                num_cols = [c for c in ['age_0_5', 'age_5_17', 'age_18_greater'] if c in target_df.columns]
-            elif dataset_choice == "Demographic":
-                target_df = demographic_df
-                num_cols = [c for c in ['demo_age_5_17', 'demo_age_17_'] if c in target_df.columns]
-            else:
-                target_df = biometric_df
-                num_cols = [c for c in ['bio_age_5_17', 'bio_age_17_'] if c in target_df.columns]
-                
-            if num_cols:
-                selected_col = st.selectbox("Select Column to Visualize", num_cols)
-                
-                # Histogram
-                fig_hist = px.histogram(target_df, x=selected_col, nbins=50, title=f"Distribution of {selected_col}", marginal="box", color_discrete_sequence=['teal'])
-                st.plotly_chart(fig_hist, use_container_width=True)
-            else:
-                st.warning("No suitable numeric columns found for distribution plot.")
-
+            distribution_panel(enrolment_df, demographic_df, biometric_df, samples=samples)
 
 elif page == "Demand Forecasting":
     st.title("Predictive Demand Forecasting")
@@ -439,76 +447,69 @@ elif page == "Demand Forecasting":
     # 1. Prepare Historical Data
     # Combine Enrolment, Demographic, and Biometric counts per day
     
-    # Filter dfs
-    f_enro = filter_data(enrolment_df)
-    f_demo = filter_data(demographic_df)
-    f_bio = filter_data(biometric_df)
-    
-    # Group by date
-    d_enro = f_enro.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Enrolments')
-    d_demo = f_demo.groupby('date')[['demo_age_5_17', 'demo_age_17_']].sum().sum(axis=1).reset_index(name='Demo Updates')
-    d_bio = f_bio.groupby('date')[['bio_age_5_17', 'bio_age_17_']].sum().sum(axis=1).reset_index(name='Bio Updates')
-    
-    # Merge all
-    hist_df = pd.merge(d_enro, d_demo, on='date', how='outer').merge(d_bio, on='date', how='outer').fillna(0)
+    hist_df = daily_totals({'enrolment': 'Enrolments', 'demographic': 'Demo Updates', 'biometric': 'Bio Updates'})
     hist_df['Total Demand'] = hist_df['Enrolments'] + hist_df['Demo Updates'] + hist_df['Bio Updates']
     hist_df = hist_df.sort_values('date')
     
-    # 2. Simple Forecast Logic (Placeholder: Moving Average + Trend)
-    # create future dates
-    last_date = hist_df['date'].max()
-    future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=30)
+    # A date range that falls in a gap in the data (or a district without activity in it) leaves no history
+    if hist_df.empty:
+        st.warning("No activity recorded for this geography and date range, so there is nothing to forecast from. Widen the date range or pick another district.")
+    else:
+        # 2. Simple Forecast Logic (Placeholder: Moving Average + Trend)
+        # create future dates
+        last_date = hist_df['date'].max()
+        future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=30)
     
-    # Simple logic: Take last 30 days average and add some random fluctuation or slight trend
-    last_30_avg = hist_df['Total Demand'].tail(30).mean()
-    if pd.isna(last_30_avg): last_30_avg = 0
+        # Simple logic: Take last 30 days average and add some random fluctuation or slight trend
+        last_30_avg = hist_df['Total Demand'].tail(30).mean()
+        if pd.isna(last_30_avg): last_30_avg = 0
     
-    import numpy as np
+        import numpy as np
     
-    # Create forecast dataframe
-    forecast_values = [last_30_avg * (1 + np.random.uniform(-0.1, 0.1)) for _ in range(30)]
-    forecast_df = pd.DataFrame({'date': future_dates, 'Total Demand': forecast_values})
-    forecast_df['Type'] = 'Forecast'
+        # Create forecast dataframe
+        forecast_values = [last_30_avg * (1 + np.random.uniform(-0.1, 0.1)) for _ in range(30)]
+        forecast_df = pd.DataFrame({'date': future_dates, 'Total Demand': forecast_values})
+        forecast_df['Type'] = 'Forecast'
     
-    # Label historical
-    hist_plot_df = hist_df[['date', 'Total Demand']].copy()
-    hist_plot_df['Type'] = 'Historical'
+        # Label historical
+        hist_plot_df = hist_df[['date', 'Total Demand']].copy()
+        hist_plot_df['Type'] = 'Historical'
     
-    # Combine
-    full_plot_df = pd.concat([hist_plot_df, forecast_df])
+        # Combine
+        full_plot_df = pd.concat([hist_plot_df, forecast_df])
     
-    # 3. Plot
-    st.subheader("30-Day Demand Forecast")
+        # 3. Plot
+        st.subheader("30-Day Demand Forecast")
     
-    fig_forecast = px.line(full_plot_df, x='date', y='Total Demand', color='Type', 
-                           color_discrete_map={'Historical': 'blue', 'Forecast': 'orange'},
-                           title=f"Projected Daily Volume for {selected_district if selected_district != 'All' else selected_state}")
+        fig_forecast = px.line(full_plot_df, x='date', y='Total Demand', color='Type', 
+                               color_discrete_map={'Historical': 'blue', 'Forecast': 'orange'},
+                               title=f"Projected Daily Volume for {selected_district if selected_district != 'All' else selected_state}")
     
-    # Add vertical line at split
-    # Add vertical line at split
-    fig_forecast.add_vline(x=last_date, line_dash="dash", line_color="green")
-    fig_forecast.add_annotation(x=last_date, y=1, yref="paper", text="Today", showarrow=False, font=dict(color="green"), yanchor="bottom")
-    st.plotly_chart(fig_forecast, use_container_width=True)
+        # Add vertical line at split
+        # Add vertical line at split
+        fig_forecast.add_vline(x=last_date, line_dash="dash", line_color="green")
+        fig_forecast.add_annotation(x=last_date, y=1, yref="paper", text="Today", showarrow=False, font=dict(color="green"), yanchor="bottom")
+        st.plotly_chart(fig_forecast, use_container_width=True)
     
-    # 4. Actionable Insights
-    st.markdown("---")
-    st.subheader("Resource Allocation Recommendations")
+        # 4. Actionable Insights
+        st.markdown("---")
+        st.subheader("Resource Allocation Recommendations")
     
-    predicted_avg = forecast_df['Total Demand'].mean()
-    current_avg = hist_df['Total Demand'].tail(30).mean()
+        predicted_avg = forecast_df['Total Demand'].mean()
+        current_avg = hist_df['Total Demand'].tail(30).mean()
     
-    col1, col2 = st.columns(2)
-    col1.metric("Current Avg Daily Volume (Last 30d)", f"{current_avg:,.0f}")
-    col2.metric("Predicted Avg Daily Volume (Next 30d)", f"{predicted_avg:,.0f}", 
-                delta=f"{((predicted_avg - current_avg)/current_avg)*100:.1f}%" if current_avg > 0 else "N/A")
-    
-    st.markdown("#### Operational Actions:")
-    if predicted_avg > current_avg * 1.2:
-        st.error("⚠️ **High Anticipated Demand**: Recommend deploying **Mobile Aadhaar Van** to this region.")
-    elif predicted_avg > current_avg * 1.05:
-        st.warning("⚠️ **Rising Demand**: Ensure full staff availability at permanent centres.")
-    else:
-        st.success("✅ **Stable/Low Demand**: Standard operations sufficient. Consider maintenance activities.")
+        col1, col2 = st.columns(2)
+        col1.metric("Current Avg Daily Volume (Last 30d)", f"{current_avg:,.0f}")
+        col2.metric("Predicted Avg Daily Volume (Next 30d)", f"{predicted_avg:,.0f}", 
+                    delta=f"{((predicted_avg - current_avg)/current_avg)*100:.1f}%" if current_avg > 0 else "N/A")
+    
+        st.markdown("#### Operational Actions:")
+        if predicted_avg > current_avg * 1.2:
+            st.error("⚠️ **High Anticipated Demand**: Recommend deploying **Mobile Aadhaar Van** to this region.")
+        elif predicted_avg > current_avg * 1.05:
+            st.warning("⚠️ **Rising Demand**: Ensure full staff availability at permanent centres.")
+        else:
+            st.success("✅ **Stable/Low Demand**: Standard operations sufficient. Consider maintenance activities.")
 
 
 elif page == "MBU Compliance Tracker":
@@ -524,29 +525,8 @@ elif page == "MBU Compliance Tracker":
     # Note: If specific district is selected in sidebar, we still want to show ALL districts in that state for comparison
     # So we re-apply state filter but ignore district filter for the main chart
     
-    m_enro = enrolment_df[enrolment_df['state'] == selected_state] if selected_state != 'All' else enrolment_df
-    m_bio = biometric_df[biometric_df['state'] == selected_state] if selected_state != 'All' else biometric_df
-    
-    # Group by District
-    e_grp = m_enro.groupby('district')[['age_5_17']].sum().reset_index().rename(columns={'age_5_17': 'Child Enrolments'})
-    b_grp = m_bio.groupby('district')[['bio_age_5_17']].sum().reset_index().rename(columns={'bio_age_5_17': 'Child Bio Updates'})
-    
-    # Merge
-    mbu_df = pd.merge(e_grp, b_grp, on='district', how='outer').fillna(0)
-    
-    # Calculate Metrics
-    # Compliance Ratio = Updates / Enrolments (Proxy)
-    # Avoid division by zero
-    mbu_df['Compliance Score'] = mbu_df['Child Bio Updates'] / mbu_df['Child Enrolments'].replace(0, 1)
-    
-    # Categorize Regions
-    def categorize_gap(row):
-        if row['Child Enrolments'] < 100: return "Low Data" # Ignore small samples
-        if row['Compliance Score'] < 0.3: return "Critical Gap (Action Needed)"
-        if row['Compliance Score'] < 0.6: return "Moderate Gap"
-        return "Good Compliance"
-
-    mbu_df['Status'] = mbu_df.apply(categorize_gap, axis=1)
+    # Group by District, score compliance and categorize regions
+    mbu_df = view.mbu_table()
     
     col1, col2 = st.columns([2, 1])
     
@@ -555,17 +535,7 @@ elif page == "MBU Compliance Tracker":
         st.subheader("Compliance Gap Analysis")
         st.markdown("Districts with **High Child Enrolment** but **Low Updates** are critical targets.")
         
-        fig_mbu = px.scatter(mbu_df, x="Child Enrolments", y="Child Bio Updates", 
-                             color="Status", 
-                             hover_data=['district', 'Compliance Score'],
-                             size="Child Enrolments",
-                             color_discrete_map={
-                                 "Critical Gap (Action Needed)": "red",
-                                 "Moderate Gap": "orange",
-                                 "Good Compliance": "green",
-                                 "Low Data": "gray"
-                             },
-                             title=f"MBU Gap Analysis: {selected_state}")
+        fig_mbu = figures['Compliance Gap Analysis']
         
         # Add diagonal line (Ideal theoretical 1:1, though realistic target is lower)
         # fig_mbu.add_shape(type="line", x0=0, y0=0, x1=mbu_df['Child Enrolments'].max(), y1=mbu_df['Child Enrolments'].max(),
@@ -601,26 +571,10 @@ elif page == "Automated Profiling":
     st.title("Automated Data Profiling")
     st.markdown("### Generate Comprehensive Data Quality Reports")
     
-    dataset_option = st.selectbox("Select Dataset to Profile", ["Enrolment Data", "Demographic Data", "Biometric Data"])
-    
-    if dataset_option == "Enrolment Data":
-        target_df = enrolment_df
-    elif dataset_option == "Demographic Data":
-        target_df = demographic_df
+    if samples:
+        profiling_panel(*(samples[name].frame for name in ('enrolment', 'demographic', 'biometric')), samples=samples)
     else:
-        target_df = biometric_df
-        
-    st.warning("⚠️ **Note**: Generating a profile report can take a few minutes depending on dataset size.")
-    
-    if st.button("Generate Profiling Report"):
-        with st.spinner(f"Generating report for {dataset_option}..."):
-            try:
-                # Use a minimal configuration if data is large, or default
-                pr = ProfileReport(target_df, title=f"{dataset_option} Profiling Report", minimal=True)
-                # Display using components.html
-                components.html(pr.to_html(), height=1000, scrolling=True)
-            except Exception as e:
-                st.error(f"Error generating report: {e}")
+        profiling_panel(enrolment_df, demographic_df, biometric_df)
 
 elif page == "Migration & Anomalies":
     st.title("🛡️ Illegal Migration & Anomaly Detection")
@@ -629,133 +583,60 @@ elif page == "Migration & Anomalies":
 
     # --- 1. Metric Calculation Engine ---
     with st.spinner("Running Anomaly Detection Algorithms..."):
-        # Working with Enrolment Data
+        # Working with daily Enrolment totals per district
         # Filter by State if detected
-        working_df = enrolment_df.copy()
-        if selected_state != "All":
-            working_df = working_df[working_df['state'] == selected_state]
-
-        # A. Aggregate at District Level (Total Volume)
-        district_stats = working_df.groupby('district')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        
-        # B. Calculate Risk Indicators
-        # Indicator 1: Adult Influx Index (AII)
-        # Logic: Natural growth usually has a balanced age pyramid. Migration is often adult-heavy.
-        # Formula: Adult Enrolments / (Child Enrolments + 1) -> Avoid div by zero
-        district_stats['Total_Enrolments'] = district_stats['age_0_5'] + district_stats['age_5_17'] + district_stats['age_18_greater']
-        district_stats['Child_Enrolments'] = district_stats['age_0_5'] + district_stats['age_5_17']
-        
-        # Scaling AII: High adult ratio is suspicious
-        district_stats['Adult_Influx_Index'] = district_stats['age_18_greater'] / (district_stats['Child_Enrolments'] + 1)
-
-        # Indicator 2: Volume Surge (Velocity)
-        # We need time-series data for this. Let's look at the last 7 days vs previous 30 days avg (Proxy)
-        # For this high-level view, we'll use Total Volume as a simple proxy for 'Magnitude' of the issue
-        # To get a real "Surge", we would need to calculate daily change per district.
-        # Let's do a simplified "Recent Intensity" if date is available, else use Total Density.
-        
-        # Advanced: Calculate Daily Velocity per District
-        # Group by District and Date
-        daily_vol = working_df.groupby(['district', 'date'])[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum(axis=1).reset_index(name='Daily_Vol')
-        
-        # Calculate trailing 7-day average per district
-        # (This is expensive on large data, so we'll do a simplified "Peak Day" metric)
-        peak_surge = daily_vol.groupby('district')['Daily_Vol'].max().reset_index(name='Peak_Daily_Surge')
-        
-        # Merge metrics
-        risk_df = pd.merge(district_stats, peak_surge, on='district')
-        
-        # Calculate Final Risk Score (Normalized)
-        # Normalize AII
-        aii_max = risk_df['Adult_Influx_Index'].max()
-        risk_df['Prop_Adult_Score'] = risk_df['Adult_Influx_Index'] / aii_max
-        
-        # Normalize Peak Surge (Log scale due to variance)
-        import numpy as np
-        risk_df['Vol_Score'] = np.log1p(risk_df['Peak_Daily_Surge']) / np.log1p(risk_df['Peak_Daily_Surge'].max())
-        
-        # Composite Risk Score: 70% Weight on Adult Ratio (Nature of migration), 30% Volume
-        risk_df['Risk_Score'] = (0.7 * risk_df['Prop_Adult_Score']) + (0.3 * risk_df['Vol_Score'])
-        
-        # Filter out low-data noise (districts with very few enrolments)
-        risk_df = risk_df[risk_df['Total_Enrolments'] > 50].sort_values(by='Risk_Score', ascending=False)
-    
-    # --- 2. Dashboard Layout ---
-    
-    # KPI Row
-    col1, col2, col3, col4 = st.columns(4)
-    highest_risk_dist = risk_df.iloc[0]['district']
-    highest_risk_score = risk_df.iloc[0]['Risk_Score']
-    avg_adult_ratio = risk_df['Adult_Influx_Index'].mean()
+        # Adult Influx Index, peak daily surge and composite risk score per district
+        risk_df = view.risk_table()
     
-    col1.metric("Highest Risk District", highest_risk_dist, help="District with highest combined anomaly score")
-    col2.metric("Max Adult/Child Ratio", f"{risk_df['Adult_Influx_Index'].max():.2f}", help="Highest ratio of Adult vs Child enrolments found")
-    col3.metric("Avg Adult/Child Ratio", f"{avg_adult_ratio:.2f}", delta=f"{((risk_df.iloc[0]['Adult_Influx_Index'] - avg_adult_ratio)/avg_adult_ratio)*100:.0f}% vs Avg")
-    col4.metric("Districts Flagged", f"{len(risk_df[risk_df['Risk_Score'] > 0.6])}", help="Districts with Risk Score > 0.6")
-
-    st.markdown("---")
-    
-    col_main, col_detail = st.columns([2, 1])
-    
-    with col_main:
-        # Scatter Plot Analysis
-        st.subheader("Anomaly Detection Grid")
-        st.markdown("Districts in the **Top-Right** (High Adult Ratio + High Surge) are primary suspects.")
-        
-        from src.plots import plot_scatter
-        # Custom scatter with color gradient based on Risk
-        fig_anom = px.scatter(risk_df, x="Adult_Influx_Index", y="Peak_Daily_Surge",
-                              color="Risk_Score", size="Total_Enrolments",
-                              hover_data=['district', 'age_18_greater', 'Child_Enrolments'],
-                              color_continuous_scale="RdYlR_r",
-                              title="Risk Profile: Influx Intensity vs Volume",
-                              labels={"Adult_Influx_Index": "Adult Influx Index (Ratio)", "Peak_Daily_Surge": "Max Daily Enrolments"})
-        
-        # Add thresholds
-        fig_anom.add_vline(x=avg_adult_ratio * 1.5, line_dash="dash", line_color="orange", annotation_text="High Adult Ratio")
-        st.plotly_chart(fig_anom, use_container_width=True)
-        
-    with col_detail:
-        st.subheader("🚨 Suspect Leaderboard")
-        st.dataframe(risk_df[['district', 'Risk_Score', 'Adult_Influx_Index', 'Total_Enrolments']]
-                     .head(15)
-                     .style.background_gradient(subset=['Risk_Score'], cmap='Reds')
-                     .format({'Risk_Score': '{:.2%}', 'Adult_Influx_Index': '{:.2f}'}))
-
-    # --- 3. Deep Dive ---
-    st.markdown("---")
-    st.subheader("district-Level Forensic Deep Dive")
-    
-    inspect_dist = st.selectbox("Select District to Investigate", risk_df['district'].head(20).tolist())
-    
-    if inspect_dist:
-        d_data = working_df[working_df['district'] == inspect_dist]
-        
-        # Daily Trend for this district
-        d_trend = d_data.groupby('date')[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        d_trend_melt = d_trend.melt(id_vars='date', var_name='Age Group', value_name='Count')
-        
-        title_txt = f"Daily Enrollment Pattern: {inspect_dist}"
-        fig_inve = px.line(d_trend_melt, x='date', y='Count', color='Age Group', title=title_txt, markers=True)
-        
-        # Highlight adult spikes
-        st.plotly_chart(fig_inve, use_container_width=True)
-        
-        # Composition
-        d_total = d_data[['age_0_5', 'age_5_17', 'age_18_greater']].sum().reset_index()
-        d_total.columns = ['Age Group', 'Count']
-        
-        c1, c2 = st.columns(2)
-        c1.plotly_chart(px.pie(d_total, names='Age Group', values='Count', title=f"Age Composition: {inspect_dist}", hole=0.4), use_container_width=True)
-        
-        with c2:
-            st.warning(f"**Forensic Note**: Investigating {inspect_dist}")
-            curr_aii = risk_df[risk_df['district'] == inspect_dist]['Adult_Influx_Index'].values[0]
-            
-            if curr_aii > avg_adult_ratio * 2:
-                st.error(f"⚠️ **Abnormal Adult Influx**: AII is {curr_aii:.2f} ({(curr_aii/avg_adult_ratio):.1f}x state avg). Strong indicator of non-birth based enrollment.")
-            else:
-                st.info(f"ℹ️ **Moderate Profile**: AII is {curr_aii:.2f}. Within normal variance, check specific dates for spikes.")
-                
-
-
+    # Short windows or small states can leave no district above the noise threshold
+    if risk_df.empty:
+        st.warning("Not enough enrolment data to score districts for this state and date range. Widen the date range or pick another state.")
+    else:
+        # --- 2. Dashboard Layout ---
+    
+        # KPI Row
+        col1, col2, col3, col4 = st.columns(4)
+        highest_risk_dist = risk_df.iloc[0]['district']
+        highest_risk_score = risk_df.iloc[0]['Risk_Score']
+        avg_adult_ratio = risk_df['Adult_Influx_Index'].mean()
+    
+        col1.metric("Highest Risk District", highest_risk_dist, help="District with highest combined anomaly score")
+        col2.metric("Max Adult/Child Ratio", f"{risk_df['Adult_Influx_Index'].max():.2f}", help="Highest ratio of Adult vs Child enrolments found")
+        col3.metric("Avg Adult/Child Ratio", f"{avg_adult_ratio:.2f}", delta=f"{((risk_df.iloc[0]['Adult_Influx_Index'] - avg_adult_ratio)/avg_adult_ratio)*100:.0f}% vs Avg")
+        col4.metric("Districts Flagged", f"{len(risk_df[risk_df['Risk_Score'] > 0.6])}", help="Districts with Risk Score > 0.6")
+
+        st.markdown("---")
+    
+        col_main, col_detail = st.columns([2, 1])
+    
+        with col_main:
+            # Scatter Plot Analysis
+            st.subheader("Anomaly Detection Grid")
+            st.markdown("Districts in the **Top-Right** (High Adult Ratio + High Surge) are primary suspects.")
+        
+            fig_anom = figures['Anomaly Detection Grid']
+            st.plotly_chart(fig_anom, use_container_width=True)
+        
+        with col_detail:
+            st.subheader("🚨 Suspect Leaderboard")
+            leaderboard = risk_df[['district', 'Risk_Score', 'Adult_Influx_Index', 'Total_Enrolments']].head(15).copy()
+            risk_state = geo_filter()[0]
+            leaderboard['Active_Pincodes'] = [sketches['enrolment'].distinct_pincodes(risk_state, d) for d in leaderboard['district']]
+            st.dataframe(leaderboard
+                         .style.background_gradient(subset=['Risk_Score'], cmap='Reds')
+                         .format({'Risk_Score': '{:.2%}', 'Adult_Influx_Index': '{:.2f}'}))
+
+        # --- 3. Deep Dive ---
+        deep_dive_panel(risk_df, avg_adult_ratio, geo_filter()[0], cube, sketches, start_date, end_date)
+
+# Warm the figures of the views the user is likely to open next (other pages, other districts)
+prefetcher.schedule(likely_next_views(view, district_list if selected_state != "All" else []))
+
+# Latency of this full rerun (panel-only reruns are recorded by the panels themselves)
+record_timing(f"page: {page}", (time.perf_counter() - run_start) * 1000)
+with st.sidebar.expander("Performance"):
+    st.dataframe(timings_frame(), hide_index=True)
+    st.caption(f"Figure cache: {len(figure_cache)} figures, {figure_cache.bytes / 1e6:.1f} MB, "
+               f"{figure_cache.hits} hits / {figure_cache.misses} misses")
+    st.caption(f"Prefetch: {prefetcher.built} figures built, {prefetcher.skipped} skipped, "
+               f"{prefetcher.cpu_seconds:.1f} CPU s")
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from src.data_access import AGE_COLUMNS
+
+ENROLMENT_COLS = AGE_COLUMNS["enrolment"]
+DEMOGRAPHIC_COLS = AGE_COLUMNS["demographic"]
+BIOMETRIC_COLS = AGE_COLUMNS["biometric"]
+
+
+def mbu_table(enrol_df, bio_df):
+    """
+    Builds the MBU compliance table (child enrolments vs child biometric
+    updates per district) used by the MBU Compliance Tracker.
+    """
+    e_grp = enrol_df.groupby('district')[['age_5_17']].sum().reset_index().rename(columns={'age_5_17': 'Child Enrolments'})
+    b_grp = bio_df.groupby('district')[['bio_age_5_17']].sum().reset_index().rename(columns={'bio_age_5_17': 'Child Bio Updates'})
+
+    mbu_df = pd.merge(e_grp, b_grp, on='district', how='outer').fillna(0)
+
+    # Compliance Ratio = Updates / Enrolments (Proxy), avoiding division by zero
+    mbu_df['Compliance Score'] = mbu_df['Child Bio Updates'] / mbu_df['Child Enrolments'].replace(0, 1)
+
+    # Categorize Regions (small samples are reported as "Low Data")
+    mbu_df['Status'] = np.select(
+        [
+            mbu_df['Child Enrolments'] < 100,
+            mbu_df['Compliance Score'] < 0.3,
+            mbu_df['Compliance Score'] < 0.6,
+        ],
+        ["Low Data", "Critical Gap (Action Needed)", "Moderate Gap"],
+        default="Good Compliance",
+    )
+    return mbu_df
+
+
+def risk_table(district_stats):
+    """
+    Builds the per-district anomaly table used by Migration & Anomalies:
+    Adult Influx Index, peak daily surge and the composite risk score.
+    district_stats holds per-district enrolment band totals and the peak
+    daily volume ('Peak_Daily'), as returned by TimeSeriesCube.district_totals.
+    Districts with 50 or fewer enrolments are dropped as noise.
+    """
+    # A. District Level totals (Total Volume)
+    risk_df = district_stats.drop(columns='Peak_Daily')
+
+    # B. Adult Influx Index: adult enrolments relative to child enrolments
+    risk_df['Total_Enrolments'] = risk_df['age_0_5'] + risk_df['age_5_17'] + risk_df['age_18_greater']
+    risk_df['Child_Enrolments'] = risk_df['age_0_5'] + risk_df['age_5_17']
+    risk_df['Adult_Influx_Index'] = risk_df['age_18_greater'] / (risk_df['Child_Enrolments'] + 1)
+
+    # C. Peak daily volume per district as the surge indicator
+    risk_df['Peak_Daily_Surge'] = district_stats['Peak_Daily']
+
+    # Normalize AII and Peak Surge (log scale due to variance)
+    risk_df['Prop_Adult_Score'] = risk_df['Adult_Influx_Index'] / risk_df['Adult_Influx_Index'].max()
+    risk_df['Vol_Score'] = np.log1p(risk_df['Peak_Daily_Surge']) / np.log1p(risk_df['Peak_Daily_Surge'].max())
+
+    # Composite Risk Score: 70% Weight on Adult Ratio (Nature of migration), 30% Volume
+    risk_df['Risk_Score'] = (0.7 * risk_df['Prop_Adult_Score']) + (0.3 * risk_df['Vol_Score'])
+
+    return risk_df[risk_df['Total_Enrolments'] > 50].sort_values(by='Risk_Score', ascending=False)
@@ -0,0 +1,200 @@
+"""
+Framework-agnostic access to the Aadhaar datasets.
+
+Loads the combined CSVs once, then serves the preprocessed frames and the
+structures derived from them (time-series cube, date indexes, sketches,
+stratified samples) from an in-process cache and a pickle cache on disk.
+Both caches are keyed by the data version, a hash of the source files'
+paths, sizes and modification times, so editing or replacing a CSV
+invalidates them automatically.
+
+Usable from notebooks and batch jobs as well as the dashboard:
+
+    from src.data_access import load_data
+    data = load_data()
+    enrolment_df = data['enrolment']
+"""
+import hashlib
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+from src.date_index import DateIndex
+from src.sampling import stratified_sample
+from src.sketches import GeoSketches
+from src.timeseries import TimeSeriesCube
+
+# Define constants for file paths
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "Data", "Combined_CSV")
+ENROLMENT_PATH = os.path.join(DATA_DIR, "api_data_aadhar_enrolment_combined.csv")
+DEMOGRAPHIC_PATH = os.path.join(DATA_DIR, "api_data_aadhar_demographic_combined.csv")
+BIOMETRIC_PATH = os.path.join(DATA_DIR, "api_data_aadhar_biometric_combined.csv")
+
+DATASET_PATHS = {
+    "enrolment": ENROLMENT_PATH,
+    "demographic": DEMOGRAPHIC_PATH,
+    "biometric": BIOMETRIC_PATH,
+}
+
+# Age-band count columns for each dataset
+AGE_COLUMNS = {
+    "enrolment": ['age_0_5', 'age_5_17', 'age_18_greater'],
+    "demographic": ['demo_age_5_17', 'demo_age_17_'],
+    "biometric": ['bio_age_5_17', 'bio_age_17_'],
+}
+
+# Fractions at which state-stratified samples are kept for approximate mode
+# (override with e.g. AADHAAR_SAMPLE_FRACTIONS=0.01,0.1)
+SAMPLE_FRACTIONS = tuple(float(f) for f in os.environ.get("AADHAAR_SAMPLE_FRACTIONS", "0.01,0.05,0.2").split(","))
+
+# On-disk cache location (override with AADHAAR_CACHE_DIR)
+CACHE_DIR = os.environ.get("AADHAAR_CACHE_DIR", os.path.join(ROOT_DIR, "Data", ".cache"))
+
+# Bump when the preprocessing or a cached structure changes shape
+CACHE_FORMAT = 2
+
+# Names of the per-version cache directories (see data_version)
+_VERSION_DIR = re.compile(r"[0-9a-f]{16}")
+
+# In-process cache: (name, data version) -> object
+_MEMORY = {}
+
+# One build lock per name, so concurrent sessions wait for a single build
+_BUILD_LOCKS = {}
+_BUILD_LOCKS_GUARD = threading.Lock()
+
+
+def data_version():
+    """Hash identifying the current contents of the source CSVs."""
+    h = hashlib.sha1(f"format={CACHE_FORMAT}".encode())
+    for name, path in sorted(DATASET_PATHS.items()):
+        st = os.stat(path)
+        h.update(f"{name}:{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def read_dataset(path):
+    """Reads one combined CSV and applies the basic preprocessing."""
+    df = pd.read_csv(path)
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
+    if 'state' in df.columns:
+        df['state'] = df['state'].astype(str).str.strip().str.title()
+    return df
+
+
+def _disk_path(version, name):
+    return os.path.join(CACHE_DIR, version, f"{name}.pkl")
+
+
+def _read_disk(version, name):
+    try:
+        with open(_disk_path(version, name), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_disk(version, name, obj):
+    """Atomically writes obj to the cache and drops caches of older data versions."""
+    version_dir = os.path.join(CACHE_DIR, version)
+    try:
+        os.makedirs(version_dir, exist_ok=True)
+        # Unique temp file: sessions are threads of one process and may write concurrently
+        fd, tmp = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=version_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, _disk_path(version, name))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        # Only prune directories this module created (CACHE_DIR may be shared)
+        for entry in os.listdir(CACHE_DIR):
+            if entry != version and _VERSION_DIR.fullmatch(entry):
+                shutil.rmtree(os.path.join(CACHE_DIR, entry), ignore_errors=True)
+    except OSError:
+        # The disk cache is an optimisation only (e.g. read-only checkout)
+        pass
+
+
+def _cached(name, build, disk=True):
+    """Returns the object for name at the current data version, building it at most once."""
+    version = data_version()
+    key = (name, version)
+    if key in _MEMORY:
+        return _MEMORY[key]
+
+    with _BUILD_LOCKS_GUARD:
+        lock = _BUILD_LOCKS.setdefault(name, threading.Lock())
+    with lock:
+        # Another session may have built it while we waited
+        if key in _MEMORY:
+            return _MEMORY[key]
+
+        obj = _read_disk(version, name) if disk else None
+        if obj is None:
+            obj = build()
+            if disk:
+                _write_disk(version, name, obj)
+
+        # Keep only the current version in memory
+        for old in [k for k in _MEMORY if k[0] == name]:
+            del _MEMORY[old]
+        _MEMORY[key] = obj
+    return obj
+
+
+def load_data():
+    """
+    Loads the Aadhaar datasets.
+    Returns a dictionary containing the three dataframes. The frames are
+    shared between callers; copy them before modifying in place.
+    Raises OSError if a source file is missing.
+    """
+    return _cached("data", lambda: {name: read_dataset(path) for name, path in DATASET_PATHS.items()})
+
+
+def load_cube():
+    """TimeSeriesCube of daily counts for all datasets."""
+    return _cached("cube", lambda: TimeSeriesCube(load_data(), AGE_COLUMNS))
+
+
+def load_date_indexes():
+    """Prefix-sum DateIndex per dataset, derived from the cube (memory only)."""
+    return _cached("date_indexes", lambda: {name: DateIndex(load_cube(), name) for name in AGE_COLUMNS}, disk=False)
+
+
+def load_sketches():
+    """Per-(state, district) GeoSketches per dataset."""
+    return _cached("sketches", lambda: {name: GeoSketches(AGE_COLUMNS[name]).update(df) for name, df in load_data().items()})
+
+
+def load_sample(name, fraction):
+    """State-stratified sample of one dataset (see src.sampling), persisted with the other caches."""
+    return _cached(f"sample_{name}_{fraction:g}", lambda: stratified_sample(load_data()[name], fraction))
+
+
+def clear_cache(disk=False):
+    """Drops the in-process cache, and the on-disk cache too if disk is True."""
+    _MEMORY.clear()
+    if disk and os.path.isdir(CACHE_DIR):
+        for entry in os.listdir(CACHE_DIR):
+            if _VERSION_DIR.fullmatch(entry):
+                shutil.rmtree(os.path.join(CACHE_DIR, entry), ignore_errors=True)
+
+
+def get_state_list(df):
+    """Returns a sorted list of unique states from the dataframe."""
+    return sorted([s for s in df['state'].unique().tolist() if isinstance(s, str) and not any(char.isdigit() for char in s)])
+
+
+def get_district_list(df, state):
+    """Returns a sorted list of unique districts for a given state."""
+    return sorted(df[df['state'] == state]['district'].unique().tolist())
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class DateIndex:
+    """
+    Prefix sums of one dataset over a dense daily date axis.
+
+    Counts are bucketed per (state, district) key and age band, and stored as
+    cumulative sums along the date axis, so the total of any [start, end]
+    window for a key is two array lookups: cum[key, end + 1] - cum[key, start].
+    """
+
+    def __init__(self, cube, name):
+        """Builds the prefix sums of dataset name from a TimeSeriesCube."""
+        self.cube = cube
+        self.name = name
+        self.columns = cube.columns[name]
+        self.first_date = cube.first_date
+        self.last_date = cube.last_date
+
+        # cum[:, t] holds the totals of days [0, t); cum[:, 0] is zero
+        daily = cube.values[name]
+        self.cum = np.zeros((daily.shape[0], daily.shape[1] + 1, daily.shape[2]), dtype=np.int64)
+        np.cumsum(daily, axis=1, dtype=np.int64, out=self.cum[:, 1:])
+
+    def window_totals(self, start=None, end=None, state=None, district=None):
+        """
+        Per-(state, district) band totals over [start, end] for the selected
+        geography (None means all). Returns a small frame with the same
+        state/district/band columns as the raw dataset.
+        """
+        span = self.cube.day_span(start, end)
+        mask = self.cube.key_mask(self.name, state, district)
+        totals = self.cum[mask, span.stop] - self.cum[mask, span.start]
+        out = self.cube.keys[mask].reset_index(drop=True)
+        out[self.columns] = totals
+        return out
+
+    def top_k(self, k, start=None, end=None, state=None, district=None, level='district', ascending=False):
+        """
+        Ranks states or districts by total activity over [start, end].
+        Returns a frame of level and 'Total', best first (worst first if ascending).
+        """
+        totals = self.window_totals(start, end, state=state, district=district)
+        ranked = totals.groupby(level)[self.columns].sum().sum(axis=1).reset_index(name='Total')
+        return ranked.sort_values(by='Total', ascending=ascending).head(k)
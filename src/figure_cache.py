@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+# Default size bound of the shared cache (serialized JSON bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """
+    Size-bounded LRU cache of serialized Plotly figures.
+
+    Figures are stored as their JSON spec, keyed by whatever identifies the
+    view (page, panel, filters, data version). Rebuilding a Figure from its
+    spec is an order of magnitude cheaper than running plotly.express again.
+    Specs larger than the whole budget are not cached.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._specs
+
+    def get(self, key):
+        """Returns the cached figure for key, or None."""
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(key)
+            self.hits += 1
+        return pio.from_json(spec)
+
+    def put(self, key, fig):
+        spec = fig.to_json()
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._specs.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._specs[key] = spec
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """Returns the cached figure for key, building and storing it on a miss."""
+        fig = self.get(key)
+        if fig is None:
+            fig = build()
+            self.put(key, fig)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self.bytes = 0
+
+
+# Process-wide cache, shared by every session of the dashboard
+figure_cache = FigureCache()
+
+
+def figure_key(page, panel, version, **filters):
+    """Cache key for one chart: page, panel, data version and the filters it depends on."""
+    return (page, panel, version, tuple(sorted((k, str(v)) for k, v in filters.items())))
+
+
+def cached_figure(key, build):
+    """figure_cache.get_or_build, or a plain build when key is None."""
+    if key is None:
+        return build()
+    return figure_cache.get_or_build(key, build)
+
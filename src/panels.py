@@ -0,0 +1,69 @@
+import functools
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from src.prefetch import foreground
+
+# Set AADHAAR_FULL_RERUNS=1 to run panels inline (no fragments), e.g. to
+# measure the per-interaction baseline with the same timings
+FULL_RERUNS = os.environ.get("AADHAAR_FULL_RERUNS") == "1"
+
+# Number of recent timings kept per label
+TIMING_HISTORY = 50
+
+
+def record_timing(label, ms):
+    """Appends one latency sample (milliseconds) for label to the session timings."""
+    timings = st.session_state.setdefault("_timings", {})
+    samples = timings.setdefault(label, [])
+    samples.append(ms)
+    del samples[:-TIMING_HISTORY]
+
+
+@contextmanager
+def timed(label):
+    """Records the wall time of the enclosed block under label."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(label, (time.perf_counter() - start) * 1000)
+
+
+def panel(name):
+    """
+    Declares an independently rerunnable dashboard panel.
+
+    The panel runs as a Streamlit fragment: a widget inside it reruns only
+    the panel, not the whole script. A panel must receive everything it reads
+    as arguments (its data dependencies); on a panel-only rerun Streamlit
+    calls it again with the arguments from the last full run.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with foreground(), timed(f"panel: {name}"):
+                return fn(*args, **kwargs)
+
+        run.panel_name = name
+        return run if FULL_RERUNS else st.fragment(run)
+    return decorate
+
+
+def timings_frame():
+    """Summary of the recorded timings: runs, last and median latency per label."""
+    timings = st.session_state.get("_timings", {})
+    return pd.DataFrame([
+        {
+            'Label': label,
+            'Runs': len(samples),
+            'Last (ms)': samples[-1],
+            'Median (ms)': statistics.median(samples),
+        }
+        for label, samples in sorted(timings.items()) if samples
+    ])
@@ -19,11 +19,11 @@ def plot_bar_distribution(df, x_col, y_col, title, color=None):
     fig = px.bar(df, x=x_col, y=y_col, color=color, title=title)
     return fig
 
-def plot_donut(df, values, names, title):
+def plot_donut(df, values, names, title, hole=0.4):
     """
     Plots a donut chart.
     """
-    fig = px.pie(df, values=values, names=names, title=title, hole=0.4)
+    fig = px.pie(df, values=values, names=names, title=title, hole=hole)
     return fig
 
 def plot_treemap(df, path, values, title):
@@ -34,6 +34,14 @@ def plot_treemap(df, path, values, title):
     fig = px.treemap(df, path=path, values=values, title=title)
     return fig
 
+def plot_sunburst(df, path, values, title, color=None, color_continuous_scale=None):
+    """
+    Plots a sunburst.
+    path: list of columns for hierarchy e.g. ['state', 'district', 'Age_Group']
+    """
+    fig = px.sunburst(df, path=path, values=values, title=title, color=color, color_continuous_scale=color_continuous_scale)
+    return fig
+
 def plot_scatter(df, x_col, y_col, title, color=None, size=None, hover_data=None):
     """
     Plots a scatter plot.
@@ -0,0 +1,147 @@
+"""
+Speculative background prefetching of dashboard figures.
+
+After each run the dashboard hands the prefetcher the views the user is
+likely to open next (src.views.likely_next_views). A single background
+thread builds their figures into the shared figure cache, one figure per
+task, so the next click is served from the cache. The thread never competes
+with foreground work:
+
+- any new run of the session cancels its pending speculative work;
+- while any foreground run or panel rerun is in progress, the thread waits
+  before starting its next task;
+- each schedule() has a CPU budget (thread CPU seconds); once it is spent
+  the remaining tasks are dropped.
+
+Set AADHAAR_PREFETCH=0 to disable prefetching, and AADHAAR_PREFETCH_BUDGET
+to change the CPU budget (seconds, default 5).
+"""
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from src.figure_cache import figure_cache
+
+ENABLED = os.environ.get("AADHAAR_PREFETCH", "1") != "0"
+
+# CPU seconds a single schedule() may spend building figures
+CPU_BUDGET = float(os.environ.get("AADHAAR_PREFETCH_BUDGET", "5"))
+
+# A foreground hold that is never released (e.g. st.stop()) expires after this many seconds
+FOREGROUND_LEASE = 30.0
+
+_tokens = itertools.count()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        return _executor
+
+
+class _ForegroundGate:
+    """Tracks foreground work in progress; background tasks wait until there is none."""
+
+    def __init__(self):
+        self._holds = {}
+        self._cond = threading.Condition()
+
+    def hold(self, token, lease=FOREGROUND_LEASE):
+        with self._cond:
+            self._holds[token] = time.monotonic() + lease
+
+    def release(self, token):
+        with self._cond:
+            self._holds.pop(token, None)
+            self._cond.notify_all()
+
+    def wait_idle(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for token in [t for t, deadline in self._holds.items() if deadline <= now]:
+                    del self._holds[token]
+                if not self._holds:
+                    return
+                self._cond.wait(min(self._holds.values()) - now)
+
+
+_gate = _ForegroundGate()
+
+
+@contextmanager
+def foreground():
+    """Marks the enclosed block as foreground work (pauses background prefetching)."""
+    token = next(_tokens)
+    _gate.hold(token)
+    try:
+        yield
+    finally:
+        _gate.release(token)
+
+
+class Prefetcher:
+    """
+    Per-session prefetcher. Call pause() at the start of a run and
+    schedule(views) at the end; pause() cancels whatever the previous
+    schedule() has not done yet.
+    """
+
+    def __init__(self, cpu_budget=CPU_BUDGET):
+        self.cpu_budget = cpu_budget
+        self.built = 0
+        self.skipped = 0
+        self.cpu_seconds = 0.0
+        self._token = next(_tokens)
+        self._generation = 0
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def pause(self):
+        """Cancels pending speculative work and holds off background tasks until schedule()."""
+        _gate.hold(self._token)
+        self.cancel()
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+
+    def schedule(self, views):
+        """Queues the figures of views (most likely first) and releases the foreground hold."""
+        _gate.release(self._token)
+        if not ENABLED:
+            return
+        with self._lock:
+            generation = self._generation
+            budget = {'left': self.cpu_budget}
+            executor = _get_executor()
+            for view in views:
+                for key, build in view.figure_specs().values():
+                    self._futures.append(executor.submit(self._run, generation, budget, key, build))
+
+    def _run(self, generation, budget, key, build):
+        _gate.wait_idle()
+        if generation != self._generation or budget['left'] <= 0 or key in figure_cache:
+            self.skipped += 1
+            return
+        start = time.thread_time()
+        try:
+            figure_cache.put(key, build())
+            self.built += 1
+        except Exception:
+            # Speculative work only: the foreground run reports real errors
+            self.skipped += 1
+        finally:
+            spent = time.thread_time() - start
+            budget['left'] -= spent
+            self.cpu_seconds += spent
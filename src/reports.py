@@ -0,0 +1,325 @@
+"""
+Batch generation of offline HTML reports.
+
+Renders the Overview, MBU Compliance and Migration & Anomalies views of the
+dashboard for every state (and optionally every district) without going
+through the Streamlit UI. Charts and tables come from the same src.views
+builders as the dashboard, over the cached time-series cube; the cube is
+handed to each pool worker once, so individual reports never touch the raw
+rows. Each pool task renders one state and all of its district reports.
+
+Usage:
+    python -m src.reports --out reports
+    python -m src.reports --out reports --districts --shared-js --workers 8
+"""
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from plotly.offline import get_plotlyjs
+
+from src.analytics import BIOMETRIC_COLS, DEMOGRAPHIC_COLS, ENROLMENT_COLS
+from src.data_access import AGE_COLUMNS, get_state_list, load_cube
+from src.date_index import DateIndex
+from src.timeseries import TimeSeriesCube
+from src.views import View, enrolment_pattern_figure, mbu_gap_figure, risk_grid_figure
+
+# Cube and date indexes shared by every report rendered in this process (see set_cube)
+_CUBE = None
+_DATE_INDEXES = None
+
+
+def build_cube(data=None):
+    """
+    Time-series cube the reports are rendered from. Without raw frames it is
+    the cached cube, so a batch run never re-parses the CSVs once the data
+    cache is warm.
+    """
+    if data is None:
+        return load_cube()
+    return TimeSeriesCube(data, AGE_COLUMNS)
+
+
+def set_cube(cube):
+    """Installs the cube used by render_report (pool initializer)."""
+    global _CUBE, _DATE_INDEXES
+    _CUBE = cube
+    _DATE_INDEXES = {name: DateIndex(cube, name) for name in AGE_COLUMNS}
+    _mbu_state.cache_clear()
+    _anomaly_state.cache_clear()
+
+
+def _view(page, state, district=None):
+    """The dashboard view of page for a state or district over all dates, built without the figure cache."""
+    return View(page, state, district or "All", None, None, _CUBE, _DATE_INDEXES, None)
+
+
+def _slugify(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_").lower()
+
+
+def _figure_html(fig, include_plotlyjs=False):
+    return fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+
+
+def _table_html(df):
+    return df.to_html(index=False, float_format=lambda x: f"{x:,.2f}", border=0, classes="report-table")
+
+
+def _overview_section(state, district, include_plotlyjs=True):
+    """Overview page: KPIs, combined activity trend, composition and leaderboards."""
+    view = _view("Overview", state, district)
+    total_enrolments = view.filter_data('enrolment')[ENROLMENT_COLS].sum().sum()
+    total_demographic_updates = view.filter_data('demographic')[DEMOGRAPHIC_COLS].sum().sum()
+    total_biometric_updates = view.filter_data('biometric')[BIOMETRIC_COLS].sum().sum()
+
+    parts = [
+        "<h2>Overview</h2>",
+        "<div class='kpis'>"
+        f"<div><span>Total Enrolments</span><b>{total_enrolments:,.0f}</b></div>"
+        f"<div><span>Demographic Updates</span><b>{total_demographic_updates:,.0f}</b></div>"
+        f"<div><span>Biometric Updates</span><b>{total_biometric_updates:,.0f}</b></div>"
+        "</div>",
+        _figure_html(view.figure('Total Activity Trend'), include_plotlyjs),
+        _figure_html(view.figure('Activity Composition')),
+    ]
+
+    if district is None:
+        parts.append(_figure_html(view.figure('Top Regions')))
+        parts.append(_figure_html(view.figure('Bottom Regions')))
+    else:
+        parts.append(_figure_html(enrolment_pattern_figure(_CUBE, state, district)))
+
+    return "\n".join(parts)
+
+
+@lru_cache(maxsize=None)
+def _mbu_state(state):
+    """State-level MBU table and gap chart, shared by the state's district reports."""
+    mbu_df = _view("MBU Compliance Tracker", state).mbu_table()
+    if mbu_df.empty:
+        return mbu_df, None
+    return mbu_df, _figure_html(mbu_gap_figure(mbu_df, state))
+
+
+@lru_cache(maxsize=None)
+def _anomaly_state(state):
+    """State-level risk table and anomaly grid, shared by the state's district reports."""
+    risk_df = _view("Migration & Anomalies", state).risk_table()
+    if risk_df.empty:
+        return risk_df, None
+    return risk_df, _figure_html(risk_grid_figure(risk_df))
+
+
+def _mbu_section(state, district):
+    """MBU Compliance Tracker: districts of the state compared, focus district highlighted."""
+    mbu_df, fig_html = _mbu_state(state)
+
+    parts = ["<h2>Mandatory Biometric Update (MBU) Compliance</h2>"]
+    if fig_html is None:
+        parts.append("<p>No MBU data for this region.</p>")
+        return "\n".join(parts)
+    parts.append(fig_html)
+
+    if district is not None:
+        parts.append("<h3>Selected District</h3>")
+        parts.append(_table_html(mbu_df[mbu_df['district'] == district]))
+
+    critical = mbu_df[mbu_df['Status'] == "Critical Gap (Action Needed)"].sort_values(by='Child Enrolments', ascending=False)
+    parts.append("<h3>Priority Intervention List</h3>")
+    if critical.empty:
+        parts.append("<p>No Critical Gaps detected in this region!</p>")
+    else:
+        parts.append(_table_html(critical.head(5)))
+    return "\n".join(parts)
+
+
+def _anomaly_section(state, district):
+    """Migration & Anomalies: risk grid and suspect leaderboard for the state."""
+    risk_df, fig_html = _anomaly_state(state)
+
+    parts = ["<h2>Migration &amp; Anomaly Detection</h2>"]
+    if fig_html is None:
+        parts.append("<p>Not enough enrolment data to score districts.</p>")
+        return "\n".join(parts)
+    parts.append(fig_html)
+
+    leaderboard = risk_df[['district', 'Risk_Score', 'Adult_Influx_Index', 'Total_Enrolments']]
+    if district is not None:
+        parts.append("<h3>Selected District</h3>")
+        parts.append(_table_html(leaderboard[leaderboard['district'] == district]))
+    parts.append("<h3>Suspect Leaderboard</h3>")
+    parts.append(_table_html(leaderboard.head(15)))
+    return "\n".join(parts)
+
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; color: #222; }}
+.kpis {{ display: flex; gap: 2rem; margin: 1rem 0; }}
+.kpis div {{ display: flex; flex-direction: column; }}
+.kpis b {{ font-size: 1.6rem; }}
+.report-table {{ border-collapse: collapse; margin: 0.5rem 0 1.5rem; }}
+.report-table th, .report-table td {{ padding: 0.25rem 0.75rem; border-bottom: 1px solid #ddd; text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Generated {generated}</p>
+{body}
+</body>
+</html>
+"""
+
+
+def render_report(state, district=None, include_plotlyjs=True):
+    """
+    Renders one HTML report from the installed cube. By default
+    plotly.js is embedded so the file is self-contained and opens offline.
+    """
+    title = f"Aadhaar Insights: {state}" if district is None else f"Aadhaar Insights: {district}, {state}"
+    body = "\n<hr>\n".join([
+        _overview_section(state, district, include_plotlyjs),
+        _mbu_section(state, district),
+        _anomaly_section(state, district),
+    ])
+    return _PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        generated=time.strftime("%Y-%m-%d %H:%M"),
+        body=body,
+    )
+
+
+def _write_state_reports(out_dir, state, jobs, include_plotlyjs=True):
+    """
+    Pool task: renders every report of one state, so the state-level MBU and
+    anomaly sections are built once and reused by its district reports.
+    Returns the written paths and (relative path, error) for reports that
+    failed; a failed report leaves no file behind.
+    """
+    paths, failures = [], []
+    for district, rel in jobs:
+        try:
+            page = render_report(state, district, include_plotlyjs=include_plotlyjs)
+        except Exception as e:
+            failures.append((rel, f"{type(e).__name__}: {e}"))
+            continue
+        path = os.path.join(out_dir, rel)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page)
+        paths.append(path)
+    return paths, failures
+
+
+class ReportError(Exception):
+    """Raised by generate_reports when some reports failed; the others were written."""
+
+    def __init__(self, paths, failures):
+        super().__init__(f"{len(failures)} report(s) failed")
+        self.paths = paths
+        self.failures = failures
+
+
+def report_jobs(cube, states=None, include_districts=False):
+    """
+    Lists (state, district, relative path) for every report to render;
+    district None means the state report. Districts whose names only differ
+    in case or punctuation get numbered file names instead of overwriting
+    each other.
+    """
+    enrol = cube.keys[cube.present["enrolment"]]
+    states = states or get_state_list(enrol)
+    jobs = []
+    for state in states:
+        state_dir = _slugify(state)
+        jobs.append((state, None, os.path.join(state_dir, "index.html")))
+        if include_districts:
+            seen = {"index"}
+            districts = sorted(enrol.loc[enrol['state'] == state, 'district'].unique().tolist())
+            for district in districts:
+                slug = base = _slugify(district) or "district"
+                n = 1
+                while slug in seen:
+                    n += 1
+                    slug = f"{base}_{n}"
+                seen.add(slug)
+                jobs.append((state, district, os.path.join(state_dir, f"{slug}.html")))
+    return jobs
+
+
+def generate_reports(out_dir, data=None, states=None, include_districts=False, workers=None, shared_js=False):
+    """
+    Renders reports for every state (and optionally district) over a process
+    pool and returns the written file paths. If any report fails, the
+    others are still written and ReportError is raised at the end. data
+    optionally supplies raw frames instead of the cached datasets.
+    shared_js writes plotly.min.js once per state folder instead of embedding
+    it (about 4 MB) in every file, which matters for district runs.
+    """
+    cube = build_cube(data)
+    jobs = report_jobs(cube, states, include_districts)
+
+    state_dirs = {os.path.join(out_dir, os.path.dirname(rel)) for _, _, rel in jobs}
+    for state_dir in state_dirs:
+        os.makedirs(state_dir, exist_ok=True)
+        if shared_js:
+            with open(os.path.join(state_dir, "plotly.min.js"), "w", encoding="utf-8") as f:
+                f.write(get_plotlyjs())
+    include_plotlyjs = "directory" if shared_js else True
+
+    by_state = {}
+    for state, district, rel in jobs:
+        by_state.setdefault(state, []).append((district, rel))
+
+    paths, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_cube, initargs=(cube,)) as pool:
+        futures = {
+            pool.submit(_write_state_reports, out_dir, state, state_jobs, include_plotlyjs): state
+            for state, state_jobs in by_state.items()
+        }
+        for future in as_completed(futures):
+            try:
+                state_paths, state_failures = future.result()
+            except Exception as e:
+                # The task itself died (e.g. a worker crash): count its whole state as failed
+                failures.append((futures[future], f"{type(e).__name__}: {e}"))
+                continue
+            paths.extend(state_paths)
+            failures.extend(state_failures)
+    if failures:
+        raise ReportError(sorted(paths), sorted(failures))
+    return sorted(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render offline HTML dashboard reports for every state.")
+    parser.add_argument("--out", default="reports", help="Output directory (default: reports)")
+    parser.add_argument("--districts", action="store_true", help="Also render one report per district")
+    parser.add_argument("--state", action="append", dest="states", help="Restrict to this state (repeatable)")
+    parser.add_argument("--shared-js", action="store_true", help="Write plotly.min.js once per state folder instead of embedding it")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        paths = generate_reports(args.out, states=args.states, include_districts=args.districts,
+                                 workers=args.workers, shared_js=args.shared_js)
+    except ReportError as e:
+        for report, error in e.failures:
+            print(f"Error rendering {report}: {error}", file=sys.stderr)
+        print(f"Wrote {len(e.paths)} reports to {args.out}; {len(e.failures)} failed", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {len(paths)} reports to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# Two-sided 95% normal quantile used for every error bound below
+Z_95 = 1.959964
+
+
+class StratifiedSample:
+    """
+    Proportional stratified random sample of a dataset.
+
+    Every stratum (state by default) keeps round(fraction * size) of its
+    rows, and at least one, so small states are still represented. The
+    sample keeps the dataset's columns; stratum sizes in the population and
+    the sample are kept alongside for the error bounds.
+    """
+
+    def __init__(self, df, fraction, strata='state', seed=0):
+        self.fraction = fraction
+        self.strata = strata
+        self.population_rows = len(df)
+
+        codes, self.stratum_labels = pd.factorize(df[strata], use_na_sentinel=False)
+        self.population = np.bincount(codes, minlength=len(self.stratum_labels))
+        self.counts = np.minimum(np.maximum(np.round(self.population * fraction), 1), self.population).astype(np.int64)
+
+        # Shuffle, rank the rows of each stratum in shuffled order and keep the first counts[h]
+        perm = np.random.default_rng(seed).permutation(len(df))
+        shuffled = codes[perm]
+        order = np.argsort(shuffled, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(self.population)[:-1]))
+        rank = np.empty(len(df), dtype=np.int64)
+        rank[order] = np.arange(len(df)) - np.repeat(starts, self.population)
+        keep = np.sort(perm[rank < self.counts[shuffled]])
+
+        self.frame = df.iloc[keep].reset_index(drop=True)
+        self.codes = codes[keep]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def label(self):
+        """Short description for chart titles and captions."""
+        return f"{self.fraction:.0%} state-stratified sample ({len(self):,} of {self.population_rows:,} rows)"
+
+    def missing_share(self):
+        """
+        Estimated share of missing values per column (percent), with the 95%
+        half-width of the stratified estimate. Columns without missing
+        values in the sample are left out.
+        """
+        weights = self.population / self.population_rows
+        finite = 1 - self.counts / self.population
+        per_stratum = self.frame.isnull().groupby(self.codes).mean().reindex(range(len(weights)), fill_value=0)
+        share = per_stratum.mul(weights, axis=0).sum()
+        variance = (per_stratum * (1 - per_stratum)).mul(weights ** 2 * finite / np.maximum(self.counts - 1, 1), axis=0).sum()
+
+        missing_df = pd.DataFrame({
+            'Column': share.index,
+            'Missing Count': share.values * self.population_rows,
+            'Percentage': share.values * 100,
+            'Error': Z_95 * np.sqrt(variance.values) * 100,
+        })
+        return missing_df[self.frame.isnull().sum().values > 0].reset_index(drop=True)
+
+    def proportion_margin(self):
+        """Worst-case 95% margin (as a fraction) of any row share estimated from the sample."""
+        n = len(self)
+        return Z_95 * np.sqrt(0.25 / n * (1 - n / self.population_rows))
+
+    def unobserved_share_bound(self):
+        """
+        95% upper bound on the share of rows with a property (e.g. a missing
+        value) when none of the sampled rows has it.
+        """
+        return 1 - 0.05 ** (1 / len(self))
+
+    def distribution_margin(self):
+        """
+        95% DKW bound: the sample's cumulative distribution of any column is
+        within this distance of the full dataset's everywhere.
+        """
+        return np.sqrt(np.log(2 / 0.05) / (2 * len(self)))
+
+
+def stratified_sample(df, fraction, strata='state', seed=0):
+    """Draws a StratifiedSample of df (see the class for the allocation)."""
+    return StratifiedSample(df, fraction, strata=strata, seed=seed)
+
+
+def correlation_interval(df):
+    """
+    Approximate 95% bounds (low, high) of df.corr(), as arrays of the same
+    shape, from the large-sample variance of Pearson's r. The variance uses
+    the sample's fourth moments rather than assuming normality (the count
+    columns are heavy-tailed), and the bounds are taken on Fisher's z scale.
+    Moments come from the rows without missing values. Rows are treated as
+    a simple random sample; proportional stratification usually makes the
+    true interval narrower. With small samples (under ~1k rows) the bounds
+    can be too narrow.
+    """
+    values = df.dropna().to_numpy(dtype=np.float64)
+    n = len(values)
+    sd = values.std(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = (values - values.mean(axis=0)) / sd
+        x2, x3 = x * x, x * x * x
+        r = x.T @ x / n
+        m22 = x2.T @ x2 / n                  # E[x^2 y^2]
+        m31 = x3.T @ x / n                   # E[x^3 y]
+        m4 = np.diag(m22)                    # E[x^4]
+        variance = (m22 + r * r / 4 * (m4[:, None] + m4[None, :] + 2 * m22) - r * (m31 + m31.T)) / n
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        half = Z_95 * np.sqrt(np.maximum(variance, 0)) / np.maximum(1 - r * r, 1e-6)
+        low, high = np.tanh(z - half), np.tanh(z + half)
+    if n < 4:
+        low[:], high[:] = np.nan, np.nan
+    np.fill_diagonal(low, 1.0)
+    np.fill_diagonal(high, 1.0)
+    return low, high
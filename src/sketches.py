@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch with 2**precision one-byte registers.
+    The standard error is about 1.04 / sqrt(2**precision) (1.6% at 12).
+    """
+
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    @staticmethod
+    def hash_values(values):
+        """64-bit hashes of any array of values (ints, strings, ...)."""
+        return pd.util.hash_array(np.asarray(values), categorize=False)
+
+    @staticmethod
+    def split_hashes(hashes, precision):
+        """Splits hashes into register indices and ranks (leading zeros + 1)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+        rest = hashes << np.uint64(precision)
+
+        # Leading zeros of the remaining bits, computed on 32-bit halves so the
+        # float log2 below is exact
+        hi = (rest >> np.uint64(32)).astype(np.float64)
+        lo = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide='ignore'):
+            lz_hi = 31 - np.floor(np.log2(hi))
+            lz_lo = 63 - np.floor(np.log2(lo))
+        lz = np.where(hi > 0, lz_hi, np.where(lo > 0, lz_lo, 64))
+        rank = np.minimum(lz, 64 - precision) + 1
+        return idx, rank.astype(np.uint8)
+
+    def add(self, values):
+        idx, rank = self.split_hashes(self.hash_values(values), self.precision)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        """Returns the sketch of the union of both inputs."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self):
+        return float(estimate_distinct(self.registers))
+
+
+def estimate_distinct(registers):
+    """
+    Cardinality estimate from HyperLogLog registers. Accepts one register
+    array or a 2-D stack (one row per sketch) and returns a float or array.
+    """
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    # Small-range correction: linear counting while empty registers remain
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the k1 scale function).
+    Centroids are small near the tails, so extreme quantiles like p95/p99
+    stay accurate while the sketch holds about `compression` centroids.
+    """
+
+    def __init__(self, compression=100, means=None, weights=None, vmin=np.inf, vmax=-np.inf):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.min = vmin
+        self.max = vmax
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total == 0:
+            return np.empty(0), np.empty(0)
+
+        # Bucket points by the k1 scale of their mid quantile; points sharing a
+        # unit of k collapse into one centroid
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        w = np.add.reduceat(weights, starts)
+        m = np.add.reduceat(means * weights, starts) / w
+        return m, w
+
+    def add(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.means, self.weights = self._compress(np.r_[self.means, values], np.r_[self.weights, weights])
+        return self
+
+    def merge(self, other):
+        """Returns a digest summarising both inputs."""
+        merged = TDigest(self.compression, vmin=min(self.min, other.min), vmax=max(self.max, other.max))
+        merged.means, merged.weights = merged._compress(np.r_[self.means, other.means], np.r_[self.weights, other.weights])
+        return merged
+
+    def quantile(self, q):
+        """Estimated quantile(s) for q in [0, 1]; NaN when the digest is empty."""
+        if self.weights.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        total = self.weights.sum()
+        mids = np.cumsum(self.weights) - self.weights / 2
+        xp = np.r_[0.0, mids, total]
+        fp = np.r_[self.min, self.means, self.max]
+        return np.interp(np.asarray(q, dtype=np.float64) * total, xp, fp)
+
+
+class GeoSketches:
+    """
+    Distinct-pincode (HyperLogLog) and daily per-pincode volume (t-digest)
+    sketches for one dataset, kept per (state, district).
+
+    Sketches only ever grow by merging, so shards or newly appended rows can
+    be folded in with update() or merge() without revisiting old data, and
+    state or national figures are merges of the district sketches.
+    """
+
+    def __init__(self, cols, precision=12, compression=200):
+        self.columns = list(cols)
+        self.precision = precision
+        self.compression = compression
+        self.pincodes = {}
+        self.volumes = {}
+
+    def update(self, df):
+        """Folds a batch of raw rows into the per-district sketches."""
+        df = df.dropna(subset=['state', 'district'])
+        if df.empty:
+            return self
+
+        # Daily per-pincode volume: total activity of one pincode on one date
+        daily = df.groupby(['state', 'district', 'pincode', 'date'], sort=False)[self.columns].sum().sum(axis=1)
+        daily = daily.reset_index(name='volume').sort_values(['state', 'district'], kind='stable')
+        grouped = daily.groupby(['state', 'district'], sort=True)
+        key_codes = grouped.ngroup().to_numpy()
+        keys = grouped.size().index.tolist()
+
+        # Registers of every district in one vectorised pass
+        idx, rank = HyperLogLog.split_hashes(HyperLogLog.hash_values(daily['pincode'].to_numpy()), self.precision)
+        registers = np.zeros((len(keys), 1 << self.precision), dtype=np.uint8)
+        np.maximum.at(registers, (key_codes, idx), rank)
+
+        volumes = daily['volume'].to_numpy(dtype=np.float64)
+        bounds = np.flatnonzero(np.r_[True, key_codes[1:] != key_codes[:-1], True])
+        for i, key in enumerate(keys):
+            hll = HyperLogLog(self.precision, registers[i])
+            digest = TDigest(self.compression).add(volumes[bounds[i]:bounds[i + 1]])
+            self.pincodes[key] = self.pincodes[key].merge(hll) if key in self.pincodes else hll
+            self.volumes[key] = self.volumes[key].merge(digest) if key in self.volumes else digest
+        return self
+
+    def merge(self, other):
+        """Combines two sketch sets (e.g. from separate shards) into a new one."""
+        merged = GeoSketches(self.columns, self.precision, self.compression)
+        for source in (self, other):
+            for key, hll in source.pincodes.items():
+                merged.pincodes[key] = merged.pincodes[key].merge(hll) if key in merged.pincodes else hll
+            for key, digest in source.volumes.items():
+                merged.volumes[key] = merged.volumes[key].merge(digest) if key in merged.volumes else digest
+        return merged
+
+    def _selected(self, state=None, district=None):
+        return [
+            key for key in self.pincodes
+            if (state is None or key[0] == state) and (district is None or key[1] == district)
+        ]
+
+    def pincode_sketch(self, state=None, district=None):
+        """Merged HyperLogLog of the selected geography (None means all)."""
+        registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        for key in self._selected(state, district):
+            np.maximum(registers, self.pincodes[key].registers, out=registers)
+        return HyperLogLog(self.precision, registers)
+
+    def volume_digest(self, state=None, district=None):
+        """Merged t-digest of the selected geography (None means all)."""
+        digest = TDigest(self.compression)
+        for key in self._selected(state, district):
+            digest = digest.merge(self.volumes[key])
+        return digest
+
+    def distinct_pincodes(self, state=None, district=None):
+        return int(round(self.pincode_sketch(state, district).count()))
+
+    def volume_quantiles(self, qs, state=None, district=None):
+        return self.volume_digest(state, district).quantile(qs)
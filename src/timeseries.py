@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+
+class TimeSeriesCube:
+    """
+    Daily counts of every dataset as dense int32 arrays indexed by
+    [district key, day, age band].
+
+    All datasets share one (state, district) key axis and one daily date
+    axis, so daily trends, rolling windows and cross-dataset totals are
+    plain slices and reductions instead of groupby/melt/merge passes.
+    """
+
+    def __init__(self, frames, columns):
+        """
+        frames: dataset name -> raw DataFrame (state, district, date, bands)
+        columns: dataset name -> list of age-band columns
+        """
+        frames = {name: df.dropna(subset=['state', 'district', 'date']) for name, df in frames.items()}
+        self.columns = {name: list(columns[name]) for name in frames}
+
+        key_frames = [df[['state', 'district']].drop_duplicates() for df in frames.values()]
+        self.keys = (pd.concat(key_frames).drop_duplicates()
+                     .sort_values(['state', 'district']).reset_index(drop=True))
+        self._states = self.keys['state'].to_numpy()
+        self._districts = self.keys['district'].to_numpy()
+        key_lookup = pd.MultiIndex.from_frame(self.keys)
+
+        days = {name: df['date'].dt.normalize() for name, df in frames.items()}
+        non_empty = [d for d in days.values() if len(d)]
+        self.first_date = min(d.min() for d in non_empty) if non_empty else pd.Timestamp.today().normalize()
+        self.last_date = max(d.max() for d in non_empty) if non_empty else self.first_date
+        self.dates = pd.date_range(self.first_date, self.last_date, freq='D')
+
+        n_keys, n_days = len(self.keys), len(self.dates)
+        self.values = {}
+        self.present = {}
+        for name, df in frames.items():
+            key_codes = key_lookup.get_indexer(pd.MultiIndex.from_frame(df[['state', 'district']]))
+            day_codes = (days[name] - self.first_date).dt.days.to_numpy()
+            flat = key_codes * n_days + day_codes
+
+            cube = np.empty((n_keys, n_days, len(self.columns[name])), dtype=np.int32)
+            for b, col in enumerate(self.columns[name]):
+                # Missing counts add nothing, as in groupby().sum()
+                weights = df[col].fillna(0).to_numpy(dtype=np.float64)
+                counts = np.bincount(flat, weights=weights, minlength=n_keys * n_days)
+                cube[:, :, b] = counts.reshape(n_keys, n_days).round()
+            self.values[name] = cube
+
+            # Keys that occur in this dataset at all (even with zero counts)
+            present = np.zeros(n_keys, dtype=bool)
+            present[key_codes] = True
+            self.present[name] = present
+
+    def day_span(self, start=None, end=None):
+        """Maps an inclusive [start, end] date window to a slice of the day axis."""
+        n_days = len(self.dates)
+        s = 0 if start is None else (pd.Timestamp(start).normalize() - self.first_date).days
+        e = n_days if end is None else (pd.Timestamp(end).normalize() - self.first_date).days + 1
+        s = min(max(s, 0), n_days)
+        e = min(max(e, s), n_days)
+        return slice(s, e)
+
+    def key_mask(self, name=None, state=None, district=None):
+        """Boolean mask over keys for a geography (None means all), limited to keys of dataset name."""
+        mask = self.present[name].copy() if name is not None else np.ones(len(self.keys), dtype=bool)
+        if state is not None:
+            mask &= self._states == state
+        if district is not None:
+            mask &= self._districts == district
+        return mask
+
+    def series(self, name, start=None, end=None, state=None, district=None):
+        """[day, band] int64 totals over the selected keys and date window."""
+        span = self.day_span(start, end)
+        mask = self.key_mask(name, state, district)
+        return self.values[name][mask, span].sum(axis=0, dtype=np.int64)
+
+    def daily(self, name, start=None, end=None, state=None, district=None):
+        """
+        Daily band totals for the selection, like df.groupby('date')[cols].sum().
+        Days without activity are dropped.
+        """
+        span = self.day_span(start, end)
+        values = self.series(name, start, end, state, district)
+        out = pd.DataFrame(values, columns=self.columns[name])
+        out.insert(0, 'date', self.dates[span])
+        return out[values.any(axis=1)].reset_index(drop=True)
+
+    def district_totals(self, name, start=None, end=None, state=None):
+        """
+        Per-district band totals and peak daily volume (all bands summed) for
+        the selection, like df.groupby('district')[cols].sum() and the max of
+        df.groupby(['district', 'date']) totals. Keys of the same district
+        name in different states are combined, as in those groupbys.
+        Districts without activity in the window are dropped.
+        """
+        span = self.day_span(start, end)
+        mask = self.key_mask(name, state)
+        codes, districts = pd.factorize(self._districts[mask])
+        order = np.argsort(codes, kind='stable')
+        selected = self.values[name][mask, span][order].astype(np.int64)
+        if len(selected):
+            values = np.add.reduceat(selected, np.searchsorted(codes[order], np.arange(len(districts))), axis=0)
+        else:
+            values = selected
+
+        out = pd.DataFrame(values.sum(axis=1), columns=self.columns[name])
+        out.insert(0, 'district', districts)
+        daily = values.sum(axis=2)
+        out['Peak_Daily'] = daily.max(axis=1, initial=0)
+        return out[daily.any(axis=1)].sort_values('district').reset_index(drop=True)
+
+    def daily_totals(self, names, start=None, end=None, state=None, district=None):
+        """
+        Cross-dataset daily totals: one column per dataset (all bands summed),
+        keeping days where any of the datasets has activity.
+        """
+        span = self.day_span(start, end)
+        out = pd.DataFrame({'date': self.dates[span]})
+        for name in names:
+            out[name] = self.series(name, start, end, state, district).sum(axis=1)
+        return out[out[list(names)].to_numpy().any(axis=1)].reset_index(drop=True)
+
+    def rolling_mean(self, name, window, start=None, end=None, state=None, district=None):
+        """
+        Trailing `window`-day mean of the selection's total activity, one value
+        per calendar day of [start, end]. Days before the window fills use the
+        days available so far.
+        """
+        totals = self.series(name, start, end, state, district).sum(axis=1)
+        cum = np.concatenate([[0], np.cumsum(totals)])
+        idx = np.arange(1, len(totals) + 1)
+        lo = np.maximum(idx - window, 0)
+        return pd.Series((cum[idx] - cum[lo]) / (idx - lo), index=self.dates[self.day_span(start, end)])
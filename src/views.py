@@ -0,0 +1,311 @@
+"""
+Filter-dependent figures of the dashboard pages, independent of Streamlit.
+
+A View is one page under one set of global filters (state, district, date
+range). Its figures are described lazily as (cache key, build) pairs, so the
+dashboard can render them through the figure cache and the background
+prefetcher (src.prefetch) can warm the cache for views the user has not
+opened yet with exactly the same keys.
+"""
+from functools import cache
+
+import pandas as pd
+import plotly.express as px
+
+from src.analytics import BIOMETRIC_COLS, DEMOGRAPHIC_COLS, ENROLMENT_COLS, mbu_table, risk_table
+from src.figure_cache import cached_figure, figure_key
+from src.plots import plot_bar_distribution, plot_donut, plot_scatter, plot_sunburst, plot_treemap, plot_trend
+
+
+class View:
+    """
+    One dashboard page under the global filters. version is the data
+    version used in figure cache keys; with None the figures are built
+    without the cache (e.g. batch reports, which render each view once).
+    """
+
+    def __init__(self, page, state, district, start, end, cube, date_indexes, version):
+        self.page = page
+        self.state = state
+        self.district = district
+        self.start = start
+        self.end = end
+        self.cube = cube
+        self.date_indexes = date_indexes
+        self.version = version
+
+    def replace(self, page=None, state=None, district=None):
+        """The same filters on another page and/or geography."""
+        return View(page or self.page, state or self.state, district or self.district,
+                    self.start, self.end, self.cube, self.date_indexes, self.version)
+
+    def geo_filter(self, state_only=False):
+        state = None if self.state == "All" else self.state
+        district = None if (state_only or self.district == "All") else self.district
+        return state, district
+
+    def filter_data(self, name, state_only=False):
+        """Per-(state, district) totals of a dataset for the active date range and geography."""
+        state, district = self.geo_filter(state_only)
+        return self.date_indexes[name].window_totals(self.start, self.end, state=state, district=district)
+
+    def daily_data(self, name, state_only=False):
+        """Daily totals of a dataset for the active filters."""
+        state, district = self.geo_filter(state_only)
+        return self.cube.daily(name, self.start, self.end, state=state, district=district)
+
+    def daily_totals(self, labels):
+        """Cross-dataset daily totals for the active filters, one column per dataset renamed via labels."""
+        totals = self.cube.daily_totals(list(labels), self.start, self.end, *self.geo_filter())
+        return totals.rename(columns=labels)
+
+    def mbu_table(self):
+        """MBU compliance table of every district of the state (the district filter does not apply)."""
+        return mbu_table(self.filter_data('enrolment', state_only=True), self.filter_data('biometric', state_only=True))
+
+    def risk_table(self):
+        """Anomaly risk table of every district of the state (the district filter does not apply)."""
+        state, _ = self.geo_filter(state_only=True)
+        return risk_table(self.cube.district_totals('enrolment', self.start, self.end, state=state))
+
+    def fig_key(self, panel, state_only=False, **extra):
+        """Figure cache key for a chart of this view (without the district for state-level charts)."""
+        if self.version is None:
+            return None
+        district = "All" if state_only else self.district
+        return figure_key(self.page, panel, self.version, state=self.state, district=district,
+                          start=self.start, end=self.end, **extra)
+
+    def figure_specs(self):
+        """{panel: (cache key, build)} for the page's filter-dependent figures."""
+        specs = PAGE_FIGURES.get(self.page)
+        return specs(self) if specs else {}
+
+    def figure(self, panel):
+        """One figure of the page, served from the figure cache where possible."""
+        return cached_figure(*self.figure_specs()[panel])
+
+    def figures(self):
+        """{panel: figure}, served from the figure cache where possible."""
+        return {panel: cached_figure(key, build) for panel, (key, build) in self.figure_specs().items()}
+
+
+def _group_level(view):
+    return 'district' if view.state != 'All' else 'state'
+
+
+def _trend(view, name, var_name, value_name, title):
+    def build():
+        daily = view.daily_data(name)
+        melted = daily.melt(id_vars='date', var_name=var_name, value_name=value_name)
+        return plot_trend(melted, 'date', value_name, title, color=var_name)
+    return view.fig_key('Trend'), build
+
+
+def _age_share(view, name, cols, title):
+    def build():
+        total_by_age = view.filter_data(name)[cols].sum().reset_index()
+        total_by_age.columns = ['Age Group', 'Total']
+        return plot_donut(total_by_age, 'Total', 'Age Group', title, hole=0.3)
+    return view.fig_key('Age Share'), build
+
+
+def _top_regions(view, name, title):
+    def build():
+        top_geo = view.date_indexes[name].top_k(10, view.start, view.end, *view.geo_filter(), level=_group_level(view))
+        return plot_bar_distribution(top_geo, _group_level(view), 'Total', title)
+    return view.fig_key('Geographic Top 10'), build
+
+
+def _district_scatter(view, panel, x, y, title):
+    """Per-district scatter of the totals of two datasets; x and y are (dataset, cols, label)."""
+    def build():
+        aggs = [view.filter_data(name).groupby('district')[cols].sum().sum(axis=1).reset_index(name=label)
+                for name, cols, label in (x, y)]
+        merged_scatter = pd.merge(aggs[0], aggs[1], on='district')
+        return plot_scatter(merged_scatter, x[2], y[2], title, hover_data=['district'])
+    return view.fig_key(panel), build
+
+
+def overview_figures(view):
+    level = _group_level(view)
+
+    @cache
+    def total_activity():
+        e = view.filter_data('enrolment').groupby(level)[ENROLMENT_COLS].sum().sum(axis=1)
+        d = view.filter_data('demographic').groupby(level)[DEMOGRAPHIC_COLS].sum().sum(axis=1)
+        b = view.filter_data('biometric').groupby(level)[BIOMETRIC_COLS].sum().sum(axis=1)
+        return (e.add(d, fill_value=0).add(b, fill_value=0)).reset_index(name='Total Activity')
+
+    def build_trend():
+        combined_trend = view.daily_totals({'enrolment': 'Enrolments', 'demographic': 'Demographic Updates', 'biometric': 'Biometric Updates'})
+        combined_melted = combined_trend.melt(id_vars='date', var_name='Activity Type', value_name='Count')
+        return plot_trend(combined_melted, 'date', 'Count', 'Daily Activity by Type', color='Activity Type')
+
+    def build_composition():
+        activity_data = pd.DataFrame({
+            'Activity': ['Enrolments', 'Demographic Updates', 'Biometric Updates'],
+            'Count': [view.filter_data(name)[cols].sum().sum() for name, cols in
+                      [('enrolment', ENROLMENT_COLS), ('demographic', DEMOGRAPHIC_COLS), ('biometric', BIOMETRIC_COLS)]]
+        })
+        return plot_donut(activity_data, 'Count', 'Activity', 'Share of Total Activity')
+
+    def build_top():
+        top = total_activity().sort_values(by='Total Activity', ascending=False).head(10)
+        return plot_bar_distribution(top, level, 'Total Activity', f'Top 10 {level.title()}s')
+
+    def build_bottom():
+        bottom = total_activity().sort_values(by='Total Activity', ascending=True).head(10)
+        return plot_bar_distribution(bottom, level, 'Total Activity', f'Least Active {level.title()}s')
+
+    return {
+        'Total Activity Trend': (view.fig_key('Total Activity Trend'), build_trend),
+        'Activity Composition': (view.fig_key('Activity Composition'), build_composition),
+        'Top Regions': (view.fig_key('Top Regions'), build_top),
+        'Bottom Regions': (view.fig_key('Bottom Regions'), build_bottom),
+    }
+
+
+def enrolment_figures(view):
+    def build_treemap():
+        # If All states, show State > District hierarchy. If specific state, show District hierarchy
+        path = ['state', 'district'] if view.state == "All" else ['district']
+        title = 'Enrolment Distribution' if view.state == "All" else 'District Enrolment Distribution'
+        treemap_df = view.filter_data('enrolment').groupby(path)[ENROLMENT_COLS].sum().sum(axis=1).reset_index(name='Total')
+        treemap_df = treemap_df[treemap_df['Total'] > 0]
+        return plot_treemap(treemap_df, path, 'Total', title)
+
+    level = _group_level(view)
+    return {
+        'Trend': _trend(view, 'enrolment', 'Age Group', 'Count', 'Enrolments by Age Group'),
+        'Age Share': _age_share(view, 'enrolment', ENROLMENT_COLS, 'Enrolment Share by Age'),
+        'Geographic Top 10': _top_regions(view, 'enrolment', f'Top 10 {level.title()}s'),
+        'Treemap': (view.fig_key('Treemap'), build_treemap),
+    }
+
+
+def demographic_figures(view):
+    def build_sunburst():
+        # Melt to get Age Group as a dimension
+        move_melted = view.filter_data('demographic').melt(id_vars=['state', 'district'],
+                                                           value_vars=DEMOGRAPHIC_COLS,
+                                                           var_name='Age_Group', value_name='Count')
+        move_melted['Age_Group'] = move_melted['Age_Group'].replace({
+            'demo_age_5_17': 'Age 5-17',
+            'demo_age_17_': 'Age 17+'
+        })
+        if view.state == "All":
+            path = ['state', 'district', 'Age_Group']
+            title = "Demographic Updates Hierarchy (Migration Proxy)"
+        else:
+            # State is fixed
+            path = ['district', 'Age_Group']
+            title = f"Demographic Updates Hierarchy in {view.state}"
+        move_agg = move_melted.groupby(path)['Count'].sum().reset_index()
+        move_agg = move_agg[move_agg['Count'] > 0]
+        return plot_sunburst(move_agg, path, 'Count', title, color='Count', color_continuous_scale='RdBu_r')
+
+    level = _group_level(view)
+    return {
+        'Trend': _trend(view, 'demographic', 'Age Category', 'Updates', 'Demographic Updates vs Time'),
+        'Age Share': _age_share(view, 'demographic', DEMOGRAPHIC_COLS, 'Demographic Updates Share'),
+        'Geographic Top 10': _top_regions(view, 'demographic', f'Highest Update Regions ({level.title()})'),
+        'Correlation Scatter': _district_scatter(view, 'Correlation Scatter',
+                                                 ('enrolment', ENROLMENT_COLS, 'Enrolment_Count'),
+                                                 ('demographic', DEMOGRAPHIC_COLS, 'Update_Count'),
+                                                 'Enrolment vs Update Volume'),
+        'Migration Sunburst': (view.fig_key('Migration Sunburst'), build_sunburst),
+    }
+
+
+def biometric_figures(view):
+    return {
+        'Trend': _trend(view, 'biometric', 'Age Category', 'Updates', 'Biometric Updates vs Time'),
+        'Age Share': _age_share(view, 'biometric', BIOMETRIC_COLS, 'Biometric Updates Share'),
+        'Geographic Top 10': _top_regions(view, 'biometric', 'Highest Biometric Update Areas'),
+        'Intensity Scatter': _district_scatter(view, 'Intensity Scatter',
+                                               ('demographic', DEMOGRAPHIC_COLS, 'Demo_Count'),
+                                               ('biometric', BIOMETRIC_COLS, 'Bio_Count'),
+                                               'Demographic vs Biometric'),
+    }
+
+
+def mbu_gap_figure(mbu_df, state):
+    """Compliance Gap Analysis scatter of an MBU table (see View.mbu_table)."""
+    return px.scatter(mbu_df, x="Child Enrolments", y="Child Bio Updates",
+                      color="Status",
+                      hover_data=['district', 'Compliance Score'],
+                      size="Child Enrolments",
+                      color_discrete_map={
+                          "Critical Gap (Action Needed)": "red",
+                          "Moderate Gap": "orange",
+                          "Good Compliance": "green",
+                          "Low Data": "gray"
+                      },
+                      title=f"MBU Gap Analysis: {state}")
+
+
+def risk_grid_figure(risk_df):
+    """Anomaly Detection Grid scatter of a risk table (see View.risk_table)."""
+    avg_adult_ratio = risk_df['Adult_Influx_Index'].mean()
+    # Custom scatter with color gradient based on Risk
+    fig = px.scatter(risk_df, x="Adult_Influx_Index", y="Peak_Daily_Surge",
+                     color="Risk_Score", size="Total_Enrolments",
+                     hover_data=['district', 'age_18_greater', 'Child_Enrolments'],
+                     color_continuous_scale="RdYlGn_r",
+                     title="Risk Profile: Influx Intensity vs Volume",
+                     labels={"Adult_Influx_Index": "Adult Influx Index (Ratio)", "Peak_Daily_Surge": "Max Daily Enrolments"})
+
+    # Add thresholds
+    fig.add_vline(x=avg_adult_ratio * 1.5, line_dash="dash", line_color="orange", annotation_text="High Adult Ratio")
+    return fig
+
+
+def enrolment_pattern_figure(cube, state, district, start=None, end=None):
+    """Forensic Deep Dive chart: a district's daily enrolments by age group and their trailing 7-day average."""
+    d_trend = cube.daily('enrolment', start, end, state=state, district=district)
+    d_trend_melt = d_trend.melt(id_vars='date', var_name='Age Group', value_name='Count')
+    fig = px.line(d_trend_melt, x='date', y='Count', color='Age Group', title=f"Daily Enrollment Pattern: {district}", markers=True)
+
+    # Highlight adult spikes against the trailing 7-day average of total enrolments
+    d_rolling = cube.rolling_mean('enrolment', 7, start, end, state=state, district=district)
+    fig.add_scatter(x=d_rolling.index, y=d_rolling.values, name='7-day Avg (Total)', line=dict(dash='dash', color='gray'))
+    return fig
+
+
+def mbu_figures(view):
+    # The page compares all districts of the state, whatever the district filter
+    def build():
+        return mbu_gap_figure(view.mbu_table(), view.state)
+    return {'Compliance Gap Analysis': (view.fig_key('Compliance Gap Analysis', state_only=True), build)}
+
+
+def anomaly_figures(view):
+    def build():
+        return risk_grid_figure(view.risk_table())
+    return {'Anomaly Detection Grid': (view.fig_key('Anomaly Detection Grid', state_only=True), build)}
+
+
+# Pages whose figures depend only on the global filters, in navigation order
+PAGE_FIGURES = {
+    "Overview": overview_figures,
+    "Enrolment Analysis": enrolment_figures,
+    "Demographic Updates": demographic_figures,
+    "Biometric Updates": biometric_figures,
+    "MBU Compliance Tracker": mbu_figures,
+    "Migration & Anomalies": anomaly_figures,
+}
+
+
+def likely_next_views(view, districts):
+    """
+    Views the user is likely to open next, most likely first: the other
+    pages for the same filters, then this page for the state's other
+    districts (districts in selectbox order, starting after the current one).
+    """
+    views = [view.replace(page=page) for page in PAGE_FIGURES if page != view.page]
+    if view.state != "All" and view.district in districts:
+        pos = districts.index(view.district)
+        for district in districts[pos + 1:] + districts[:pos]:
+            views.append(view.replace(district=district))
+    return views
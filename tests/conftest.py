@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def enrolment_df():
+    """Synthetic raw enrolment rows with some missing counts, like the API extracts."""
+    rng = np.random.default_rng(0)
+    n = 30000
+    states = np.array(['Karnataka', 'Goa', 'Bihar'])
+    state = states[rng.integers(0, len(states), n)]
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2025-03-01') + pd.to_timedelta(rng.integers(0, 120, n), unit='D'),
+        'state': state,
+        'district': [f"{s[:3]}-{d}" for s, d in zip(state, rng.integers(0, 12, n))],
+        'pincode': rng.integers(560000, 561000, n),
+        'age_0_5': rng.poisson(3, n).astype(float),
+        'age_5_17': rng.poisson(2, n).astype(float),
+        'age_18_greater': rng.poisson(1, n).astype(float),
+    })
+    for col in ['age_0_5', 'age_5_17', 'age_18_greater']:
+        df.loc[rng.choice(n, 50, replace=False), col] = np.nan
+    return df
@@ -0,0 +1,45 @@
+import os
+import threading
+import time
+
+from src import data_access
+
+
+def test_disk_cache_only_prunes_its_own_versions(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_access, "CACHE_DIR", str(tmp_path))
+    (tmp_path / "important_project").mkdir()
+    (tmp_path / "important_project" / "notes.txt").write_text("keep")
+    old_version = "0123456789abcdef"
+    (tmp_path / old_version).mkdir()
+
+    data_access._write_disk("fedcba9876543210", "cube", {"x": 1})
+
+    assert data_access._read_disk("fedcba9876543210", "cube") == {"x": 1}
+    assert (tmp_path / "important_project" / "notes.txt").exists()
+    assert not (tmp_path / old_version).exists()
+    assert not [f for f in os.listdir(tmp_path / "fedcba9876543210") if f.endswith(".tmp")]
+
+    data_access.clear_cache(disk=True)
+    assert os.listdir(tmp_path) == ["important_project"]
+
+
+def test_concurrent_callers_share_one_build(monkeypatch):
+    monkeypatch.setattr(data_access, "data_version", lambda: "0123456789abcdef")
+    monkeypatch.setattr(data_access, "_MEMORY", {})
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(data_access._cached("slow", build, disk=False)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len({id(r) for r in results}) == 1
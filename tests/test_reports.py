@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import reports
+
+
+def test_failed_reports_leave_no_file_and_raise(enrolment_df, tmp_path, monkeypatch):
+    demographic = enrolment_df.rename(columns={'age_5_17': 'demo_age_5_17', 'age_18_greater': 'demo_age_17_'})
+    biometric = enrolment_df.rename(columns={'age_5_17': 'bio_age_5_17', 'age_18_greater': 'bio_age_17_'})
+    data = {'enrolment': enrolment_df, 'demographic': demographic, 'biometric': biometric}
+
+    def render(state, district=None, include_plotlyjs=True):
+        if state == 'Goa':
+            raise ValueError("broken")
+        return f"<html>{state}</html>"
+
+    # Threads instead of processes so the patched renderer is used
+    monkeypatch.setattr(reports, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(reports, "render_report", render)
+
+    with pytest.raises(reports.ReportError) as err:
+        reports.generate_reports(str(tmp_path), data=data)
+
+    assert [rel for rel, _ in err.value.failures] == ["goa/index.html"]
+    assert not (tmp_path / "goa" / "index.html").exists()
+    assert (tmp_path / "bihar" / "index.html").read_text() == "<html>Bihar</html>"
+    assert len(err.value.paths) == 2
+
+
+def test_cli_exits_non_zero_on_failures(monkeypatch, capsys):
+    def generate(*args, **kwargs):
+        raise reports.ReportError(["ok.html"], [("goa/index.html", "ValueError: broken")])
+
+    monkeypatch.setattr(reports, "generate_reports", generate)
+    monkeypatch.setattr("sys.argv", ["reports", "--out", "out"])
+    with pytest.raises(SystemExit) as exit_info:
+        reports.main()
+
+    assert exit_info.value.code == 1
+    assert "goa/index.html: ValueError: broken" in capsys.readouterr().err
+
+
+def test_reports_render_from_the_cube(enrolment_df):
+    demographic = enrolment_df.rename(columns={'age_5_17': 'demo_age_5_17', 'age_18_greater': 'demo_age_17_'})
+    biometric = enrolment_df.rename(columns={'age_5_17': 'bio_age_5_17', 'age_18_greater': 'bio_age_17_'})
+    reports.set_cube(reports.build_cube({'enrolment': enrolment_df, 'demographic': demographic, 'biometric': biometric}))
+
+    state_page = reports.render_report('Goa')
+    goa = enrolment_df[enrolment_df['state'] == 'Goa']
+    total = goa[['age_0_5', 'age_5_17', 'age_18_greater']].sum().sum()
+    assert f"<b>{total:,.0f}</b>" in state_page
+    assert "Top 10 Districts" in state_page
+    assert "Risk Profile: Influx Intensity vs Volume" in state_page
+
+    district_page = reports.render_report('Goa', 'Goa-3')
+    assert "Daily Enrollment Pattern: Goa-3" in district_page
+    assert "MBU Gap Analysis: Goa" in district_page
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from src.sampling import correlation_interval, stratified_sample
+
+COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+
+
+def test_sample_is_proportional_per_state(enrolment_df):
+    sample = stratified_sample(enrolment_df, 0.05)
+    expected = (enrolment_df['state'].value_counts() * 0.05).round()
+    assert (sample.frame['state'].value_counts().sort_index() == expected.sort_index()).all()
+
+
+def test_missing_share_bounds_cover_full_data(enrolment_df):
+    sample = stratified_sample(enrolment_df, 0.2)
+    estimate = sample.missing_share().set_index('Column')
+    exact = enrolment_df[estimate.index].isnull().mean() * 100
+    assert ((estimate['Percentage'] - exact).abs() <= 3 * estimate['Error']).all()
+
+
+def test_unobserved_share_bound():
+    sample = stratified_sample(pd.DataFrame({'state': ['a'] * 1000}), 0.3)
+    # Rule of three: about 3 / n
+    assert abs(sample.unobserved_share_bound() - 3 / 300) < 1e-3
+
+
+def test_correlation_interval_covers_full_data(enrolment_df):
+    df = enrolment_df.copy()
+    df['age_18_greater'] = df['age_18_greater'] + df['age_0_5']
+    exact = df[COLS].corr().to_numpy()
+    low, high = correlation_interval(stratified_sample(df, 0.2).frame[COLS])
+    assert np.all((low <= exact + 1e-9) & (exact <= high + 1e-9))
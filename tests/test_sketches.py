@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.sketches import GeoSketches, HyperLogLog, TDigest
+
+COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+
+
+def test_hyperloglog_close_to_exact_distinct_count():
+    values = np.random.default_rng(1).integers(0, 10**9, 200000)
+    hll = HyperLogLog(12).add(values)
+    exact = len(np.unique(values))
+    # Standard error at precision 12 is about 1.6%
+    assert abs(hll.count() - exact) / exact < 0.05
+
+
+def test_tdigest_close_to_exact_quantiles():
+    values = np.random.default_rng(2).lognormal(1, 1, 100000)
+    digest = TDigest(200).add(values[:50000]).merge(TDigest(200).add(values[50000:]))
+    for q in (0.5, 0.95):
+        exact = np.quantile(values, q)
+        assert abs(digest.quantile([q])[0] - exact) / exact < 0.02
+
+
+def test_geo_sketches_match_groupby_and_merge_across_shards(enrolment_df):
+    half = len(enrolment_df) // 2
+    sketches = GeoSketches(COLS).update(enrolment_df.iloc[:half]).merge(GeoSketches(COLS).update(enrolment_df.iloc[half:]))
+
+    exact_pincodes = enrolment_df.groupby(['state', 'district'])['pincode'].nunique()
+    for (state, district), exact in exact_pincodes.items():
+        assert abs(sketches.distinct_pincodes(state, district) - exact) <= max(2, 0.05 * exact)
+
+    daily = enrolment_df.groupby(['state', 'district', 'pincode', 'date'])[COLS].sum().sum(axis=1)
+    karnataka = daily.loc['Karnataka']
+    assert abs(sketches.volume_quantiles([0.5], 'Karnataka')[0] - karnataka.quantile(0.5)) <= 1
+    assert abs(sketches.distinct_pincodes() - enrolment_df['pincode'].nunique()) / enrolment_df['pincode'].nunique() < 0.05
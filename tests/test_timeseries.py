@@ -0,0 +1,41 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from src.date_index import DateIndex
+from src.timeseries import TimeSeriesCube
+
+COLS = ['age_0_5', 'age_5_17', 'age_18_greater']
+
+
+def test_daily_matches_groupby_with_missing_counts(enrolment_df):
+    cube = TimeSeriesCube({'enrolment': enrolment_df}, {'enrolment': COLS})
+    got = cube.daily('enrolment', state='Karnataka')
+    expected = (enrolment_df[enrolment_df['state'] == 'Karnataka']
+                .groupby('date')[COLS].sum().astype('int64').reset_index())
+    assert_frame_equal(got, expected, check_freq=False)
+
+
+def test_window_totals_match_groupby_with_missing_counts(enrolment_df):
+    cube = TimeSeriesCube({'enrolment': enrolment_df}, {'enrolment': COLS})
+    index = DateIndex(cube, 'enrolment')
+    start, end = pd.Timestamp('2025-04-01'), pd.Timestamp('2025-05-15')
+
+    got = index.window_totals(start, end, state='Goa').set_index(['state', 'district'])
+    window = enrolment_df[(enrolment_df['date'] >= start) & (enrolment_df['date'] <= end) & (enrolment_df['state'] == 'Goa')]
+    expected = window.groupby(['state', 'district'])[COLS].sum().astype('int64')
+    assert_frame_equal(got.sort_index(), expected.sort_index(), check_dtype=False)
+    assert (got[COLS] >= 0).all().all()
+
+
+def test_district_totals_match_groupby(enrolment_df):
+    # A district name shared by two states is combined, as a groupby on the name would
+    df = pd.concat([enrolment_df, enrolment_df[enrolment_df['state'] == 'Goa'].assign(state='Bihar')])
+    cube = TimeSeriesCube({'enrolment': df}, {'enrolment': COLS})
+    start, end = pd.Timestamp('2025-04-01'), pd.Timestamp('2025-05-15')
+
+    got = cube.district_totals('enrolment', start, end)
+    window = df[(df['date'] >= start) & (df['date'] <= end)]
+    expected = window.groupby('district')[COLS].sum().astype('int64')
+    daily = window.groupby(['district', 'date'])[COLS].sum().sum(axis=1)
+    expected['Peak_Daily'] = daily.groupby('district').max().astype('int64')
+    assert_frame_equal(got, expected.reset_index(), check_dtype=False)